@@ -1,16 +1,22 @@
 from glob import glob
 import os
-import pandas as pd
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import argparse
-from utils import project_features
+from utils import data_io, project_features
 
 """
 """
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--outname", "-o")
+parser.add_argument("--window", "-w", default=None, type=int,
+                    help="Compute and plot the bus factor of each project "
+                         "over rolling windows of WINDOW months")
+parser.add_argument("--table", default=None,
+                    help="TSV file in which the bus factor of each project "
+                         "(and month, with --window) is written")
 args = parser.parse_args()
 
 outname = args.outname
@@ -18,33 +24,60 @@ outname = args.outname
 filenames = glob("data/raw_data/*/commits.tsv")
 filenames.sort()
 
-labels = []
-fig, ax = plt.subplots()
-for i, filename in enumerate(filenames):
-
+# Load the commits of all projects in a single table
+columns = ["author_name"] if args.window is None else ["author_name", "date"]
+commits = []
+for filename in filenames:
     # Parse project name
     project = filename.split("/")[2].split("_")[0]
+    project_commits = data_io.read_github_tsv(filename, columns=columns,
+                                              keep_default_na=False)
+    project_commits["project"] = project
+    commits.append(project_commits)
+commits = pd.concat(commits, ignore_index=True)
 
-    commits = pd.read_csv(filename, sep="\t", keep_default_na=False)
-    bus_factor = project_features.compute_bus_factor(commits)
-    labels.append(project)
-    ax.bar([i],
-           [bus_factor],
-           label=project,
-           color="C%d" % i,
-           zorder=10)
+bus_factors = project_features.compute_bus_factors(commits,
+                                                   window=args.window)
+if args.table is not None:
+    try:
+        os.makedirs(os.path.dirname(args.table))
+    except OSError:
+        pass
+    bus_factors.to_csv(args.table, sep="\t", header=True)
+
+fig, ax = plt.subplots()
+if args.window is None:
+    labels = []
+    for i, (project, bus_factor) in enumerate(bus_factors.items()):
+        labels.append(project)
+        ax.bar([i],
+               [bus_factor],
+               label=project,
+               color="C%d" % i,
+               zorder=10)
+    ax.set_xticks(np.arange(len(labels)))
+    ax.set_xticklabels(labels, rotation=25, fontsize="small",
+                       fontweight="bold", color="0.5",
+                       horizontalalignment="right")
+else:
+    # one line per project, over the months of its history
+    for i, (project, project_bus_factors) in enumerate(
+            bus_factors.groupby(level="project")):
+        months = project_bus_factors.index.get_level_values("month")
+        ax.plot(months.to_timestamp(), project_bus_factors.values,
+                label=project, color="C%d" % i, zorder=10)
+    ax.legend(fontsize="x-small")
 
-ax.set_title("Bus factor estimation", fontweight="bold",
-             fontsize="large")
+title = "Bus factor estimation"
+if args.window is not None:
+    title += " over %d-month windows" % args.window
+ax.set_title(title, fontweight="bold", fontsize="large")
 
 ax.spines['right'].set_color('none')
 ax.spines['left'].set_color('none')
 ax.spines['top'].set_color('none')
 ax.xaxis.set_ticks_position('bottom')
 ax.yaxis.set_ticks_position('left')
-ax.set_xticks(np.arange(len(filenames)))
-ax.set_xticklabels(labels, rotation=25, fontsize="small", fontweight="bold",
-                   color="0.5", horizontalalignment="right")
 ax.set_ylabel("Bus factor estimation", color="0.5", fontweight="bold",
               fontsize="medium")
 ax.grid(which='major', axis='y', linewidth=0.75, linestyle='-',
@@ -1,9 +1,10 @@
 from glob import glob
 import os
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import argparse
+import pandas as pd
+from utils import concentration, data_io
 
 """
 This is a reproduction of Fernando's 2011 normalized commit rate plot. This
@@ -25,12 +26,11 @@ for i, filename in enumerate(filenames):
     # Parse project name
     project = filename.split("/")[2].split("_")[0]
 
-    commits = pd.read_csv(filename, sep="\t", keep_default_na=False)
-    commits[commits["author_name"].isnull()]["author_name"] = ""
-    _, ticket_counts = np.unique(commits["author_name"], return_counts=True)
-    ticket_counts.sort()
-    ticket_counts = ticket_counts[::-1] / ticket_counts.max()
-    ax.plot(ticket_counts[:15] * 100,
+    commits = data_io.read_github_tsv(filename, columns=["author_name"],
+                                      keep_default_na=False)
+    author_codes, _ = pd.factorize(commits["author_name"].fillna(""))
+    commit_shares = concentration.top_k_shares(np.bincount(author_codes), 15)
+    ax.plot(commit_shares * 100,
             label=project,
             marker=".", color="C%d" % i,
             linewidth=2)
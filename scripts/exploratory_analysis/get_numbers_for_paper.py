@@ -3,6 +3,7 @@ import os
 import numpy as np
 import pandas as pd
 import argparse
+from utils import data_io
 
 """
 Getting numbers for the paper and putting them in a nicely formatted latex
@@ -26,11 +27,14 @@ summary_data = pd.DataFrame(
 all_authors = None
 for filename in filenames:
     project = filename.split("/")[-2]
-    tickets = pd.read_csv(filename, keep_default_na=False, sep="\t")
-    comments = pd.read_csv(
-        filename.replace("tickets.tsv", "comments.tsv"),
-        sep="\t",
+    tickets = data_io.read_github_tsv(
+        filename, columns=["author_name", "ticket_id", "type"],
         keep_default_na=False)
+    comments = data_io.read_github_tsv(
+        filename.replace("tickets.tsv", "comments.tsv"),
+        columns=["author_name", "ticket_id"], keep_default_na=False)
+    tickets["author_name"] = tickets["author_name"].fillna("")
+    comments["author_name"] = comments["author_name"].fillna("")
     project_authors = np.unique(comments["author_name"])
     project_authors = np.unique(
         np.concatenate([project_authors,
@@ -0,0 +1,73 @@
+"""
+Plotting the number of comments, tickets and commits of a project over time.
+
+Comments and issues are counted every two months, and commits every three
+months. Projects with less than 12 such bins are plotted every week.
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from utils import timeseries
+
+# for each source: granularity, spacing of the ticks, title and label of the
+# y axis
+FIGURES = {
+    "comments": ("2M", 4, "Comments", "Number of comments"),
+    "tickets": ("2M", 2, "issues", "Number of issues"),
+    "commits": ("3M", 4, "Commits", "Number of Commits"),
+}
+
+parser = argparse.ArgumentParser()
+parser.add_argument("folder",
+                    help="Folder of the project, with the comments.tsv, "
+                         "tickets.tsv and commits.tsv files")
+parser.add_argument("--outname", "-o",
+                    help="Filename of the figures, with %%(source)s replaced "
+                         "by comments, tickets or commits")
+args = parser.parse_args()
+
+folder = args.folder.rstrip("/")
+outname = args.outname
+
+##############################################################################
+# Load stuff in memory.
+project = os.path.basename(folder)
+# Now load the bot names
+bots = pd.read_csv("../bot_names.txt")
+counts = timeseries.load_activity_counts(folder, bots.values.ravel())
+
+
+for source, (freq, tick_step, title, ylabel) in sorted(FIGURES.items()):
+    sampled = counts.loc[(source, freq)]
+    if len(sampled) < 12:
+        sampled = counts.loc[(source, "W")]
+
+    fig, ax = plt.subplots(figsize=(6, 3), tight_layout=True)
+    ax.bar(np.arange(sampled.shape[0]),
+           sampled["total"],
+           color="#C1C1C1")
+    ax.bar(np.arange(sampled.shape[0]),
+           sampled["total"] - sampled["bots"],
+           color="#000000")
+
+    ax.set_xticks(np.arange(0, len(sampled), tick_step))
+    ax.set_xticklabels(
+        sampled.index.strftime("%b %Y")[::tick_step], rotation=45,
+        horizontalalignment="right",
+        fontsize="small")
+    ax.set_title("%s (%s)" % (project, title), fontweight="bold")
+    ax.set_ylabel(ylabel, fontweight="bold")
+    ax.spines["right"].set_linewidth(0)
+    ax.spines["top"].set_linewidth(0)
+
+    if outname is not None:
+        filename = outname % {"source": source}
+        try:
+            os.makedirs(os.path.dirname(filename))
+        except OSError:
+            pass
+        fig.savefig(filename)
+    plt.close(fig)
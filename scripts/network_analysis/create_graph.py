@@ -1,14 +1,27 @@
-import pandas as pd
+import argparse
 from joblib import Memory
 import numpy as np
-from utils import create_graph
-from utils import compute_contributions_per_project
+from utils_graphs import create_graph, graph_from_adjacency
+from utils_graphs import closeness_centrality
+from utils_graphs import load_contributions_per_project
+from utils_data import load_sentiment_frame
 
 mem = Memory(".cache")
 
+parser = argparse.ArgumentParser()
+parser.add_argument("--epsilon", default=None, type=float,
+                    help="Approximate the closeness centrality with this "
+                         "error bound, by sampling pivot nodes (default: "
+                         "exact closeness)")
+parser.add_argument("--n-jobs", "-j", default=1, type=int,
+                    help="Number of processes computing the closeness "
+                         "centrality (-1 to use all CPUs)")
+args = parser.parse_args()
+
 
 print("Loading data")
-data = pd.read_csv("results/data/sentiment_frame_original.tsv", sep="\t")
+data = load_sentiment_frame(
+    columns=["author_name", "project", "ticket_id", "type_family"])
 # First, do some sanity check on this file. Ticket_id should be unique per
 # project for posts.
 assert np.all(data[data["type_family"] == "post"].groupby(
@@ -16,7 +29,7 @@ assert np.all(data[data["type_family"] == "post"].groupby(
 
 
 print("Computing the number of contributiors per project per user")
-contributions_per_project = mem.cache(compute_contributions_per_project)(data)
+contributions_per_project = load_contributions_per_project()
 
 # Select users that have contributed to more than one project
 #authors_of_interest = np.array(
@@ -33,22 +46,20 @@ print("Estimating adjacency matrix")
 all_authors_mapping = {
     a: i for i, a in enumerate(np.unique(data["author_name"]))}
 adjacency_matrix = mem.cache(create_graph)(data, all_authors_mapping)
-contributions_per_project = compute_contributions_per_project(data)
 
 
 # Remove the diagonal
-#adjacency_matrix[np.diag_indices_from(adjacency_matrix)] = 0
+#adjacency_matrix.setdiag(0)
 
 
 ###############################################################################
 # Ok… Let's try a simple visualization with Matplotlib & Grave
 import matplotlib.pyplot as plt
 import networkx
-from networkx.algorithms.centrality import closeness_centrality
 import grave
 
 all_projects = contributions_per_project.columns
-graph = networkx.convert_matrix.from_numpy_matrix(np.log(adjacency_matrix+1))
+graph = graph_from_adjacency(adjacency_matrix.log1p())
 # Add some information
 
 colors_projects = {"matplotlib": "C0",
@@ -72,7 +83,9 @@ for node, nodes_attr in graph.nodes(data=True):
 
 # Let's attempt to put some alpha on the edge based on some closeness
 # centrality
-centrality = closeness_centrality(graph)
+centrality = closeness_centrality(graph, epsilon=args.epsilon,
+                                  n_jobs=args.n_jobs)
+networkx.set_node_attributes(graph, centrality, "closeness")
 max_centrality = max(centrality.values())
 for u, v, edge_attributes in graph.edges.data():
     c = (centrality[u] +
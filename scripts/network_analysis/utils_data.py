@@ -0,0 +1,52 @@
+import os
+import pandas as pd
+import utils_cache
+
+
+SENTIMENT_FRAME = "results/data/sentiment_frame_original.tsv"
+
+
+def load_sentiment_frame(columns=None, filename=SENTIMENT_FRAME,
+                         cachedir=".cache"):
+    """
+    Load the posts and replies written by the sentiment analysis
+
+    The TSV file is parsed once and stored in a Feather file in cachedir (see
+    `utils_cache.cached()`), from which only the requested columns are read.
+    The Feather file is rebuilt when the modification time or size of the
+    TSV file change. Without pyarrow, the requested columns are read from the
+    TSV file.
+
+    Requires: pandas , pyarrow (optional)
+
+    Parameters
+    ----------
+    columns : list of str, optional, default: None
+        Columns to load. All columns are loaded if None.
+
+    filename : str, optional
+        TSV file written by the sentiment analysis
+
+    cachedir : str, optional, default: ".cache"
+        Folder in which the Feather file is stored
+
+    Returns
+    -------
+    pd.DataFrame
+
+    Examples
+    --------
+    >> from utils_data import load_sentiment_frame
+    >> data = load_sentiment_frame(columns=["author_name", "project"])
+    """
+    if not utils_cache.has_pyarrow():
+        return pd.read_csv(filename, sep="\t", usecols=columns)
+
+    def compute():
+        return pd.read_csv(filename, sep="\t", low_memory=False)
+
+    return utils_cache.cached(
+        compute, os.path.abspath(filename),
+        utils_cache.file_fingerprint(filename),
+        os.path.join(cachedir, "sentiment_frame"), format="feather",
+        columns=columns)
@@ -0,0 +1,291 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+import utils_cache
+import utils_parallel
+from utils_data import SENTIMENT_FRAME, load_sentiment_frame
+
+
+def compute_contributions_per_project(data):
+    """
+    Count the contributions of each author to each project
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Posts and replies, with author_name and project columns (as in
+        results/data/sentiment_frame_original.tsv).
+
+    Returns
+    -------
+    contributions_per_project : pd.DataFrame, shape (n_authors, n_projects)
+        Number of contributions of each author (rows, sorted by name) to each
+        project (columns, sorted by name). Rows are in the same order as the
+        nodes of `create_graph()`.
+
+    Examples
+    --------
+    >> from utils_graphs import compute_contributions_per_project
+    >> contributions_per_project = compute_contributions_per_project(data)
+    >> number_of_projects_contributed_to = (
+    >>     contributions_per_project != 0).sum(axis=1)
+    """
+    data = data[["author_name", "project"]].dropna()
+    author_codes, authors = pd.factorize(data["author_name"], sort=True)
+    project_codes, projects = pd.factorize(data["project"], sort=True)
+
+    counts = np.bincount(
+        author_codes * len(projects) + project_codes,
+        minlength=len(authors) * len(projects))
+    return pd.DataFrame(
+        counts.reshape(len(authors), len(projects)),
+        index=pd.Index(authors, name="author_name"),
+        columns=pd.Index(projects, name="project"))
+
+
+def load_contributions_per_project(filename=SENTIMENT_FRAME,
+                                   cachedir=".cache"):
+    """
+    Load the contributions of each author to each project
+
+    The result of `compute_contributions_per_project()` is cached on disk
+    (see `utils_cache.cached()`), so that it is only computed again when the
+    modification time or size of filename change.
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    filename : str, optional
+        Posts and replies, as written by the sentiment analysis
+
+    cachedir : str, optional, default: ".cache"
+        Folder in which the results are cached
+
+    Returns
+    -------
+    contributions_per_project : pd.DataFrame, shape (n_authors, n_projects)
+    """
+    def compute():
+        data = load_sentiment_frame(columns=["author_name", "project"],
+                                    filename=filename, cachedir=cachedir)
+        return compute_contributions_per_project(data)
+
+    return utils_cache.cached(
+        compute, os.path.abspath(filename),
+        utils_cache.file_fingerprint(filename),
+        os.path.join(cachedir, "contributions_per_project"))
+
+
+def create_graph(data, authors_mapping=None):
+    """
+    Compute the co-contribution graph of the authors
+
+    Two authors are connected if they both contributed (posted or replied) to
+    the same ticket. The graph is computed as the product of the sparse
+    author × ticket incidence matrix with its transpose, so that only pairs
+    of authors that share tickets are ever stored.
+
+    Requires: numpy , pandas , scipy
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Posts and replies, with author_name, project and ticket_id columns
+        (as in results/data/sentiment_frame_original.tsv).
+
+    authors_mapping : dict, optional, default: None
+        Index of each author in the adjacency matrix. Defaults to the authors
+        sorted by name. Contributions of authors that are not in the mapping
+        are ignored.
+
+    Returns
+    -------
+    adjacency_matrix : scipy.sparse.csr_matrix, shape (n_authors, n_authors)
+        Number of tickets both authors contributed to. The diagonal holds the
+        number of tickets each author contributed to.
+
+    Examples
+    --------
+    >> from utils_graphs import create_graph, graph_from_adjacency
+    >> adjacency_matrix = create_graph(data)
+    >> graph = graph_from_adjacency(adjacency_matrix.log1p())
+    """
+    data = data[["author_name", "project", "ticket_id"]].dropna()
+    if authors_mapping is None:
+        authors_mapping = {
+            a: i for i, a in enumerate(np.unique(data["author_name"]))}
+    n_authors = len(authors_mapping)
+
+    author_codes = data["author_name"].map(authors_mapping)
+    keep = author_codes.notnull().values
+    author_codes = author_codes.values[keep].astype(np.int64)
+
+    # ticket ids are only unique within a project
+    ticket_codes = data.loc[keep].groupby(
+        ["project", "ticket_id"]).ngroup().values
+    n_tickets = ticket_codes.max() + 1 if len(ticket_codes) else 0
+
+    # Several contributions of an author to a ticket count once
+    incidence = sparse.csr_matrix(
+        (np.ones(len(author_codes)), (author_codes, ticket_codes)),
+        shape=(n_authors, n_tickets))
+    incidence.sum_duplicates()
+    incidence.data[:] = 1
+
+    adjacency_matrix = (incidence @ incidence.T).tocsr()
+    adjacency_matrix.sort_indices()
+    return adjacency_matrix
+
+
+def graph_from_adjacency(adjacency_matrix):
+    """
+    Create a networkx graph from a sparse adjacency matrix
+
+    Only the nonzero entries of the matrix become edges, with their value as
+    "weight" attribute. Nodes are the indices of the rows of the matrix.
+
+    Requires: networkx
+
+    Parameters
+    ----------
+    adjacency_matrix : scipy.sparse matrix, shape (n_nodes, n_nodes)
+        Symmetric adjacency matrix, for example the one returned by
+        `create_graph()`, optionally transformed with `.log1p()`.
+
+    Returns
+    -------
+    networkx.Graph
+    """
+    import networkx
+
+    adjacency_matrix = sparse.csr_matrix(adjacency_matrix)
+    adjacency_matrix.eliminate_zeros()
+    try:
+        return networkx.from_scipy_sparse_array(adjacency_matrix)
+    except AttributeError:
+        # networkx < 2.7
+        return networkx.from_scipy_sparse_matrix(adjacency_matrix)
+
+
+def closeness_centrality(graph, epsilon=None, n_jobs=1, random_state=None):
+    """
+    Compute the closeness centrality of the nodes of a graph
+
+    Gives the same (unweighted) closeness centrality as
+    `networkx.closeness_centrality`: in disconnected graphs, the closeness of
+    a node is computed within its connected component, and scaled by the
+    fraction of the nodes it can reach.
+
+    Exact closeness requires a shortest path search from every node. With
+    epsilon, the searches are only run from pivots sampled in each
+    connected component (Eppstein & Wang, 2004): ceil(log(n) / epsilon ** 2)
+    pivots in a component of n nodes, so that the estimated average distance
+    of each node to the others is within epsilon times the diameter of its
+    component, with high probability. At least 2 pivots are used per
+    component, and components smaller than the number of pivots are computed
+    exactly.
+
+    Requires: numpy , scipy , networkx
+
+    Parameters
+    ----------
+    graph : networkx.Graph
+
+    epsilon : float, optional, default: None
+        Error bound of the approximation. If None, compute the exact
+        closeness.
+
+    n_jobs : int, optional, default: 1
+        Number of processes among which the shortest path searches are
+        split (-1 to use all CPUs)
+
+    random_state : int or np.random.RandomState, optional, default: None
+        Seed of the sampling of the pivots
+
+    Returns
+    -------
+    centrality : dict
+        Closeness centrality of each node
+
+    Examples
+    --------
+    >> centrality = closeness_centrality(graph, epsilon=0.1, n_jobs=4)
+    >> networkx.set_node_attributes(graph, centrality, "closeness")
+    """
+    import networkx
+
+    nodes = list(graph.nodes)
+    n_nodes = len(nodes)
+    if n_nodes < 2:
+        return {node: 0. for node in nodes}
+    try:
+        adjacency = networkx.to_scipy_sparse_array(
+            graph, nodelist=nodes, weight=None, format="csr")
+    except AttributeError:
+        # networkx < 2.7
+        adjacency = networkx.to_scipy_sparse_matrix(
+            graph, nodelist=nodes, weight=None, format="csr")
+    adjacency = sparse.csr_matrix(adjacency)
+
+    _, components = csgraph.connected_components(adjacency, directed=False)
+    component_sizes = np.bincount(components)
+    if epsilon is None:
+        n_pivots = component_sizes
+        order = np.argsort(components, kind="stable")
+    else:
+        # At least 2 pivots: the only pivot of a component would not reach
+        # any other pivot, and get a centrality of 0.
+        n_pivots = np.maximum(np.ceil(
+            np.log(np.maximum(component_sizes, 2)) / epsilon ** 2), 2)
+        n_pivots = np.minimum(n_pivots, component_sizes).astype(np.int64)
+        # shuffle the nodes, then take the first nodes of each component
+        rng = random_state
+        if not isinstance(rng, np.random.RandomState):
+            rng = np.random.RandomState(rng)
+        permutation = rng.permutation(n_nodes)
+        order = permutation[
+            np.argsort(components[permutation], kind="stable")]
+    starts = np.cumsum(component_sizes) - component_sizes
+    ranks = np.arange(n_nodes) - starts[components[order]]
+    pivots = order[ranks < n_pivots[components[order]]]
+
+    n_jobs = utils_parallel.effective_n_jobs(n_jobs)
+    if n_jobs > 1:
+        shards = np.array_split(pivots, 4 * n_jobs)
+        with utils_parallel.create_pool(
+                n_jobs, state={"adjacency": adjacency}) as pool:
+            distances = np.sum(
+                pool.map(_sum_distances, shards), axis=0)
+    else:
+        distances = _sum_distances(pivots, adjacency)
+
+    # Graphs are undirected: the distances from the pivots to a node estimate
+    # the distances from that node to all the nodes of its component.
+    sizes = component_sizes[components]
+    distances *= sizes / n_pivots[components]
+    centrality = np.zeros(n_nodes)
+    reachable = distances > 0
+    centrality[reachable] = (
+        (sizes[reachable] - 1) ** 2 /
+        (distances[reachable] * (n_nodes - 1)))
+    return dict(zip(nodes, centrality.tolist()))
+
+
+def _sum_distances(sources, adjacency=None, block_size=64):
+    # Sum of the shortest path lengths from the sources to each node. Paths
+    # are computed by blocks of sources, to bound the memory used.
+    if adjacency is None:
+        adjacency = utils_parallel.worker_state["adjacency"]
+    distances = np.zeros(adjacency.shape[0])
+    for start in range(0, len(sources), block_size):
+        block = csgraph.shortest_path(
+            adjacency, directed=False, unweighted=True,
+            indices=sources[start:start + block_size])
+        block[np.isinf(block)] = 0
+        distances += block.sum(axis=0)
+    return distances
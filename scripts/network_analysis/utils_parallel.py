@@ -0,0 +1 @@
+../survivor_analysis/utils/parallel.py
\ No newline at end of file
@@ -5,110 +5,289 @@ Sentiment analysis feature extractions
 import os
 import argparse
 import pandas as pd
-from utils import annotate, project_features
-
-parser = argparse.ArgumentParser()
-parser.add_argument("folder",
-                    help="Folder containing the data downloaded from GitHub")
-parser.add_argument("--output-folder", "-o", default=None)
-args = parser.parse_args()
-
-folder = args.folder
-output_folder = args.output_folder
-
-project = folder.split("/")[-1]
-
-print("Extracting features for", project)
-
-# load in the lists needed
-bot_list = pd.read_csv('../bot_names.txt')['bot_name']
-gratitude_list = set(
-    pd.read_csv('./utils/gratitude.txt')['expressions_of_gratitude'])
-
-# Load all of the information we have on the projects
-temp_comments = pd.read_csv(os.path.join(folder, 'comments.tsv'),
-                            sep='\t', index_col=0).sort_index()
-temp_tickets = pd.read_csv(os.path.join(folder, 'tickets.tsv'),
-                           sep='\t', index_col=0).sort_index()
-temp_commits = pd.read_csv(os.path.join(folder, 'commits.tsv'),
-                           sep='\t', index_col=0).sort_index()
-
-# append the current project to each
-temp_comments['project'] = project
-temp_tickets['project'] = project
-temp_commits['project'] = project
-
-# annotate each file
-temp_comments, temp_tickets = annotate.annotate_logs(temp_comments,
-                                                     temp_tickets)
-
-# Drop the comments and tickets we don't need.
-if "include_in_2019_data" in temp_comments.columns:
-    temp_comments = temp_comments[temp_comments["include_in_2019_data"]]
-
-if "include_in_2019_data" in temp_tickets.columns:
-    temp_tickets = temp_tickets[temp_tickets["include_in_2019_data"]]
-
-if "include_in_2019_data" in temp_commits.columns:
-    temp_commits = temp_commits[temp_commits["include_in_2019_data"]]
-
-
-# drop columns we don't need
-temp_comments = temp_comments.drop(
-    columns=['node_id', 'updated_at', 'author_id'])
-temp_tickets = temp_tickets.drop(
-    columns=['node_id', 'organization', 'author_id', 'locked'])
-# temp_commits = temp_commits.drop(columns=['author_id','sha'])
-
-# clean up the text body
-temp_comments = annotate.body_cleanup(temp_comments, gratitude_list, bot_list)
-temp_tickets = annotate.body_cleanup(temp_tickets, gratitude_list, bot_list)
-
-print("Running sentiment analysis for", project)
-# run sentiment analysis
-temp_comments = annotate.add_sentiment(temp_comments)
-temp_tickets = annotate.add_sentiment(temp_tickets)
-# temp_commits = annotate.add_sentiment(temp_commits)
-
-# add gratitude info
-print("Running gratitude analysis for", project)
-temp_comments = annotate.add_gratitude(temp_comments, gratitude_list)
-temp_tickets = annotate.add_gratitude(temp_tickets, gratitude_list)
-# temp_commits = annotate.add_gratitude(temp_commits, gratitude_list)
-
-# join the dataframes
-temp_tickets.set_index("ticket_id", inplace=True, drop=False)
-temp_joined_frame = (temp_comments.join(
-    temp_tickets,
-    lsuffix='_comment',
-    rsuffix='_issue',
-    on='ticket_id').reset_index(
-        drop=True).drop(
-            columns='project_comment').rename(
-                columns={'project_issue': 'project'}))
-
-# calculate bus factor
-temp_bus_factor = project_features.compute_bus_factor(temp_commits)
-temp_joined_frame['bus_factor'] = temp_bus_factor
-
-# save cleaned data to intermediary folders
-if output_folder is not None:
-    print("Writing results in", output_folder)
+from utils import annotate, data_io, project_features, sentiment_cache
 
+
+def load_word_lists():
+    """
+    Load the bot names and the expressions of gratitude
+
+    Returns
+    -------
+    bot_list : pd.Series of bot usernames
+
+    gratitude_list : expressions of gratitude, compiled with
+        `annotate.compile_gratitude()`
+    """
+    bot_list = pd.read_csv('../bot_names.txt')['bot_name']
+    gratitude_list = annotate.compile_gratitude(
+        pd.read_csv('./utils/gratitude.txt')['expressions_of_gratitude'])
+    return bot_list, gratitude_list
+
+
+# columns of the comments needed to annotate them with annotate_logs
+ANNOTATION_COLUMNS = ["created_at", "updated_at", "ticket_id", "author_id"]
+
+# columns dropped from the processed files
+DROPPED_COLUMNS = {
+    "comments": ['node_id', 'updated_at', 'author_id'],
+    "tickets": ['node_id', 'organization', 'author_id', 'locked'],
+}
+
+
+def select_2019_data(frame):
+    """
+    Drop the rows not included in the 2019 data, if the frame says so
+    """
+    if "include_in_2019_data" in frame.columns:
+        frame = frame[frame["include_in_2019_data"]]
+    return frame
+
+
+def add_text_features(frame, bot_list, gratitude_list, n_jobs=1,
+                      cache=None, pool=None):
+    """
+    Clean up the bodies, and add the sentiment and gratitude features
+    """
+    frame = annotate.body_cleanup(frame, gratitude_list, bot_list)
+    frame = annotate.add_sentiment(frame, n_jobs=n_jobs, cache=cache,
+                                   pool=pool)
+    frame = annotate.add_gratitude(frame, gratitude_list)
+    return frame
+
+
+def join_comments_tickets(comments, tickets):
+    """
+    Join each comment with its ticket
+
+    tickets should be indexed by ticket_id.
+    """
+    return (comments.join(
+        tickets,
+        lsuffix='_comment',
+        rsuffix='_issue',
+        on='ticket_id').reset_index(
+            drop=True).drop(
+                columns='project_comment').rename(
+                    columns={'project_issue': 'project'}))
+
+
+def extract_features(folder, output_folder=None, bot_list=None,
+                     gratitude_list=None, n_jobs=1, cache=None,
+                     format="csv", as_of=None, chunksize=None):
+    """
+    Extract the features of a project, and save them in output_folder
+
+    Parameters
+    ----------
+    folder : str
+        Folder containing the data downloaded from GitHub
+
+    output_folder : str, optional, default: None
+        Folder in which the processed files are written. If None, nothing is
+        written.
+
+    bot_list, gratitude_list : optional
+        As returned by `load_word_lists()`. Loaded if not provided.
+
+    n_jobs : int, optional, default: 1
+        Number of processes used for the sentiment analysis
+
+    cache : sentiment_cache.SentimentCache, optional
+        Cache of the sentiment scores
+
+    format : {"csv", "parquet"}, optional, default: "csv"
+        Format of the processed files
+
+    as_of : str, optional, default: None
+        Date at which the data was collected, used as the closing date of open
+        tickets. Defaults to the most recent timestamp of the tickets.
+
+    chunksize : int, optional, default: None
+        If provided, the comments are processed by chunks of chunksize rows,
+        and the processed comments and joined files are appended chunk by
+        chunk, so that the memory used does not depend on the number of
+        comments. Requires output_folder, and only supports the csv format.
+
+    Returns
+    -------
+    comments, tickets, commits, joined : pd.DataFrame
+        comments and joined are None when processing by chunks.
+    """
+    if chunksize is not None:
+        if output_folder is None:
+            raise ValueError(
+                "Processing comments by chunks requires an output folder")
+        if format != "csv":
+            raise ValueError(
+                "Processing comments by chunks only supports the csv format")
+
+    project = os.path.basename(os.path.normpath(folder))
+
+    print("Extracting features for", project)
+
+    # load in the lists needed
+    if bot_list is None or gratitude_list is None:
+        bot_list, gratitude_list = load_word_lists()
+
+    # Load all of the information we have on the projects. When processing
+    # by chunks, only load the columns of the comments needed to annotate
+    # them: the bodies are loaded chunk by chunk later.
+    comments_filename = os.path.join(folder, 'comments.tsv')
+    usecols = None
+    if chunksize is not None:
+        header = pd.read_csv(comments_filename, sep='\t', nrows=0).columns
+        usecols = [header[0]] + ANNOTATION_COLUMNS
+    temp_comments = pd.read_csv(comments_filename, sep='\t', index_col=0,
+                                usecols=usecols)
+    if chunksize is None:
+        temp_comments = temp_comments.sort_index()
+    temp_tickets = pd.read_csv(os.path.join(folder, 'tickets.tsv'),
+                               sep='\t', index_col=0).sort_index()
+    temp_commits = pd.read_csv(os.path.join(folder, 'commits.tsv'),
+                               sep='\t', index_col=0).sort_index()
+
+    # append the current project to each
+    temp_comments['project'] = project
+    temp_tickets['project'] = project
+    temp_commits['project'] = project
+
+    # annotate each file
+    temp_comments, temp_tickets = annotate.annotate_logs(
+        temp_comments, temp_tickets, as_of=as_of)
+
+    # Drop the comments, tickets and columns we don't need.
+    temp_tickets = select_2019_data(temp_tickets).drop(
+        columns=DROPPED_COLUMNS["tickets"])
+    temp_commits = select_2019_data(temp_commits)
+    # temp_commits = temp_commits.drop(columns=['author_id','sha'])
+
+    # clean up the text body, run sentiment analysis (only scoring bodies
+    # that are not cached) and add gratitude info
+    print("Running sentiment and gratitude analysis for", project)
+    temp_tickets = add_text_features(temp_tickets, bot_list, gratitude_list,
+                                     n_jobs=n_jobs, cache=cache)
+    temp_tickets.set_index("ticket_id", inplace=True, drop=False)
+    # temp_commits = add_text_features(temp_commits, ...)
+
+    # calculate bus factor
+    temp_bus_factor = project_features.compute_bus_factor(temp_commits)
+
+    if output_folder is not None:
+        print("Writing results in", output_folder)
+
+        try:
+            os.makedirs(output_folder)
+        except OSError:
+            pass
+
+    if chunksize is None:
+        temp_comments = select_2019_data(temp_comments).drop(
+            columns=DROPPED_COLUMNS["comments"])
+        temp_comments = add_text_features(
+            temp_comments, bot_list, gratitude_list, n_jobs=n_jobs,
+            cache=cache)
+        temp_joined_frame = join_comments_tickets(temp_comments, temp_tickets)
+        temp_joined_frame['bus_factor'] = temp_bus_factor
+        outputs = [("comments", temp_comments), ("tickets", temp_tickets),
+                   ("commits", temp_commits), ("joined", temp_joined_frame)]
+    else:
+        _process_comments_by_chunks(
+            comments_filename, temp_comments, temp_tickets, temp_bus_factor,
+            output_folder, chunksize, bot_list, gratitude_list,
+            n_jobs=n_jobs, cache=cache)
+        temp_comments, temp_joined_frame = None, None
+        outputs = [("tickets", temp_tickets), ("commits", temp_commits)]
+
+    if cache is not None:
+        print("Sentiment cache: %d hits, %d misses" %
+              (cache.hits, cache.misses))
+
+    # save cleaned data to intermediary folders
+    if output_folder is not None:
+        for name, frame in outputs:
+            data_io.write_processed(
+                frame, os.path.join(output_folder, "processed-%s" % name),
+                format=format)
+
+    return temp_comments, temp_tickets, temp_commits, temp_joined_frame
+
+
+def _process_comments_by_chunks(filename, annotations, tickets, bus_factor,
+                                output_folder, chunksize, bot_list,
+                                gratitude_list, n_jobs=1, cache=None):
+    # annotations holds the columns added by annotate_logs for all the
+    # comments, in the order of the file
+    annotations = annotations.drop(columns=ANNOTATION_COLUMNS)
+    outputs = {
+        name: os.path.join(output_folder, "processed-%s.csv" % name)
+        for name in ("comments", "joined")}
+
+    # the sentiment of all the chunks is scored by the same processes
+    pool = annotate.create_sentiment_pool(n_jobs)
     try:
-        os.makedirs(output_folder)
-    except OSError:
-        pass
-
-    temp_comments.to_csv(
-        os.path.join(output_folder, 'processed-comments.csv'),
-        index=False, header=True)
-    temp_tickets.to_csv(
-        os.path.join(output_folder, 'processed-tickets.csv'),
-        index=False, header=True)
-    temp_commits.to_csv(
-        os.path.join(output_folder, 'processed-commits.csv'),
-        index=False, header=True)
-    temp_joined_frame.to_csv(
-        os.path.join(output_folder, 'processed-joined.csv'),
-        index=False, header=True)
+        start = 0
+        reader = pd.read_csv(filename, sep='\t', index_col=0,
+                             chunksize=chunksize)
+        for chunk in reader:
+            # annotations are aligned on the position in the file, in case
+            # the index has duplicates
+            chunk_annotations = annotations.iloc[start:start + len(chunk)]
+            chunk_annotations.index = chunk.index
+            chunk = pd.concat([chunk, chunk_annotations], axis=1)
+            chunk = select_2019_data(chunk).drop(
+                columns=DROPPED_COLUMNS["comments"])
+            chunk = add_text_features(chunk, bot_list, gratitude_list,
+                                      n_jobs=n_jobs, cache=cache, pool=pool)
+            joined = join_comments_tickets(chunk, tickets)
+            joined['bus_factor'] = bus_factor
+
+            for name, frame in [("comments", chunk), ("joined", joined)]:
+                frame.to_csv(outputs[name], index=False, header=start == 0,
+                             mode="w" if start == 0 else "a")
+            start += len(chunk_annotations)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder",
+                        help="Folder containing the data downloaded from "
+                             "GitHub")
+    parser.add_argument("--output-folder", "-o", default=None)
+    parser.add_argument("--n-jobs", "-j", default=1, type=int,
+                        help="Number of processes used for the sentiment "
+                             "analysis (-1 to use all CPUs)")
+    parser.add_argument("--sentiment-cache", default=None,
+                        help="SQLite file caching the sentiment scores across "
+                             "runs")
+    parser.add_argument("--sentiment-cache-size", default=None, type=int,
+                        help="Maximum number of bodies kept in the sentiment "
+                             "cache")
+    parser.add_argument("--format", "-f", default="csv",
+                        choices=sorted(data_io.EXTENSIONS),
+                        help="Format of the processed files")
+    parser.add_argument("--as-of", default=None,
+                        help="Date at which the data was collected, used to "
+                             "compute the open duration of open tickets "
+                             "(default: most recent timestamp of the tickets)")
+    parser.add_argument("--chunksize", default=None, type=int,
+                        help="Process the comments by chunks of CHUNKSIZE "
+                             "rows, to limit the memory used on large "
+                             "projects (csv format only)")
+    args = parser.parse_args()
+
+    cache = None
+    if args.sentiment_cache is not None:
+        cache = sentiment_cache.SentimentCache(
+            args.sentiment_cache, max_entries=args.sentiment_cache_size)
+
+    extract_features(args.folder, output_folder=args.output_folder,
+                     n_jobs=args.n_jobs, cache=cache, format=args.format,
+                     as_of=args.as_of, chunksize=args.chunksize)
+
+    if cache is not None:
+        cache.close()
@@ -0,0 +1,106 @@
+"""
+Sentiment analysis feature extractions for many projects at once
+
+The bot names and expressions of gratitude are loaded once, and the projects
+are processed concurrently in a pool of worker processes. The outputs are the
+same as running `extract_features.py` on each project folder.
+"""
+
+import os
+import argparse
+import time
+from extract_features import extract_features, load_word_lists
+from utils import data_io, parallel, sentiment_cache
+
+
+def _process_project(args):
+    folder, output_folder = args
+    resources = parallel.worker_state
+    cache = None
+    if resources["cache_filename"] is not None:
+        cache = sentiment_cache.SentimentCache(
+            resources["cache_filename"],
+            max_entries=resources["cache_size"])
+
+    start = time.time()
+    extract_features(folder, output_folder=output_folder,
+                     bot_list=resources["bot_list"],
+                     gratitude_list=resources["gratitude_list"],
+                     cache=cache, format=resources["format"],
+                     as_of=resources["as_of"],
+                     chunksize=resources["chunksize"])
+    elapsed = time.time() - start
+
+    if cache is not None:
+        cache.close()
+    return os.path.basename(os.path.normpath(folder)), elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folders", nargs="+",
+                        help="Folders containing the data downloaded from "
+                             "GitHub, one per project")
+    parser.add_argument("--output-folder", "-o", default=None,
+                        help="Results of each project are written in "
+                             "OUTPUT_FOLDER/<project>")
+    parser.add_argument("--n-jobs", "-j", default=1, type=int,
+                        help="Number of projects processed concurrently (-1 "
+                             "to use all CPUs)")
+    parser.add_argument("--sentiment-cache", default=None,
+                        help="SQLite file caching the sentiment scores across "
+                             "runs")
+    parser.add_argument("--sentiment-cache-size", default=None, type=int,
+                        help="Maximum number of bodies kept in the sentiment "
+                             "cache")
+    parser.add_argument("--format", "-f", default="csv",
+                        choices=sorted(data_io.EXTENSIONS),
+                        help="Format of the processed files")
+    parser.add_argument("--as-of", default=None,
+                        help="Date at which the data was collected, used to "
+                             "compute the open duration of open tickets "
+                             "(default: most recent timestamp of the tickets "
+                             "of each project)")
+    parser.add_argument("--chunksize", default=None, type=int,
+                        help="Process the comments by chunks of CHUNKSIZE "
+                             "rows, to limit the memory used on large "
+                             "projects (csv format only)")
+    parser.add_argument("--timings", default=None,
+                        help="TSV file in which the time spent on each "
+                             "project is written")
+    args = parser.parse_args()
+
+    tasks = []
+    for folder in args.folders:
+        output_folder = None
+        if args.output_folder is not None:
+            output_folder = os.path.join(
+                args.output_folder,
+                os.path.basename(os.path.normpath(folder)))
+        tasks.append((folder, output_folder))
+
+    bot_list, gratitude_list = load_word_lists()
+    resources = {
+        "bot_list": bot_list, "gratitude_list": gratitude_list,
+        "cache_filename": args.sentiment_cache,
+        "cache_size": args.sentiment_cache_size, "format": args.format,
+        "as_of": args.as_of, "chunksize": args.chunksize}
+
+    start = time.time()
+    timings = []
+    n_jobs = parallel.effective_n_jobs(args.n_jobs, len(tasks))
+    with parallel.create_pool(n_jobs, state=resources) as pool:
+        for project, elapsed in pool.imap_unordered(_process_project, tasks):
+            print("Done with %s in %0.1fs" % (project, elapsed))
+            timings.append((project, elapsed))
+    total = time.time() - start
+
+    print("Processed %d projects in %0.1fs" % (len(timings), total))
+    for project, elapsed in sorted(timings, key=lambda t: -t[1]):
+        print("    %-30s %8.1fs" % (project, elapsed))
+
+    if args.timings is not None:
+        with open(args.timings, "w") as f:
+            f.write("project\tseconds\n")
+            for project, elapsed in timings:
+                f.write("%s\t%f\n" % (project, elapsed))
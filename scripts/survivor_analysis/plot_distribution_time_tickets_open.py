@@ -1,45 +1,79 @@
 import argparse
 import numpy as np
 import os
-import pandas as pd
 import matplotlib.pyplot as plt
 
-from utils import annotate
+from utils import activity
 from utils import visualization
 
 parser = argparse.ArgumentParser()
-parser.add_argument("project")
-parser.add_argument("--type", "-t", default="pull_request")
-parser.add_argument("--outname", "-o")
+parser.add_argument("filenames", nargs="+",
+                    help="issues.tsv files of the projects")
+parser.add_argument("--type", "-t", default=["pull_request"], nargs="+",
+                    choices=["pull_request", "issue"],
+                    help="Types of tickets. One figure is drawn per project "
+                         "and type.")
+parser.add_argument("--outname", "-o",
+                    help="Filename of the figures. With several projects or "
+                         "types, it should contain %%(project)s and "
+                         "%%(type)s, replaced by the project and the type.")
+parser.add_argument("--max-days", default=200, type=int,
+                    help="Durations are capped at MAX_DAYS days")
+parser.add_argument("--include-open", action="store_true",
+                    help="Also count the tickets that are still open, with "
+                         "the time elapsed between their creation and the "
+                         "most recent timestamp of the project. By default, "
+                         "only closed tickets are counted.")
 args = parser.parse_args()
 
-project = args.project
-ticket_type = args.type
+filenames = args.filenames
+ticket_types = args.type
 outname = args.outname
+max_days = args.max_days
+if outname is not None:
+    if len(filenames) > 1 and "%(project)s" not in outname:
+        parser.error("--outname should contain %(project)s with several "
+                     "projects")
+    if len(ticket_types) > 1 and "%(type)s" not in outname:
+        parser.error("--outname should contain %(type)s with several types")
 
 
-tickets = pd.read_csv("data/%s/issues.tsv" % project, sep="\t")
-comments = pd.read_csv("data/%s/comments.tsv" % project, sep="\t")
+for filename in filenames:
+    project = filename.split("/")[-2]
+    _, tickets = activity.load_activity(filename)
+    # tickets with a known creation date, closed unless --include-open is
+    # given: open tickets are considered closed at the as-of date
+    keep = tickets["open_duration"].notnull()
+    if not args.include_open:
+        keep &= tickets["is_closed"]
+    tickets = tickets[keep]
 
-comments, tickets = annotate.annotate_comments_tickets(comments, tickets)
-tickets = tickets[tickets["type"] == ticket_type]
-open_duration = np.array(
-    [t.days for t in tickets["open_duration"]
-     if not type(t) == float])
-open_duration[open_duration > 200] = 200
+    for ticket_type in ticket_types:
+        open_duration = tickets.loc[
+            tickets["type"] == ticket_type, "open_duration"].values
+        # number of whole days before the ticket is closed (or the as-of
+        # date)
+        open_duration = np.minimum(open_duration // (24 * 3600), max_days)
 
-fig, ax = plt.subplots()
-ax.hist(open_duration, color="#000000", bins=100)
-visualization.format_ax(ax)
-ax.set_xlabel("Number of days before a ticket is closed (capped at 200)",
-              fontweight="bold", fontsize="small")
-ax.set_ylabel("Number of tickets", fontweight="bold", fontsize="small")
-ax.set_title(project, fontweight="bold")
+        fig, ax = plt.subplots()
+        ax.hist(open_duration, color="#000000", bins=100)
+        visualization.format_ax(ax)
+        xlabel = "Number of days before a ticket is closed"
+        if args.include_open:
+            xlabel = "Number of days a ticket is open"
+        ax.set_xlabel(
+            "%s (capped at %d)" % (xlabel, max_days),
+            fontweight="bold", fontsize="small")
+        ax.set_ylabel("Number of tickets", fontweight="bold",
+                      fontsize="small")
+        ax.set_title(project, fontweight="bold")
 
-if outname is not None:
-    try:
-        os.makedirs(os.path.dirname(outname))
-    except OSError:
-        pass
+        if outname is not None:
+            figname = outname % {"project": project, "type": ticket_type}
+            try:
+                os.makedirs(os.path.dirname(figname))
+            except OSError:
+                pass
 
-    fig.savefig(outname)
+            fig.savefig(figname)
+        plt.close(fig)
@@ -1,9 +1,7 @@
 import argparse
 import os
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-from utils import visualization
+from utils import activity, visualization
 
 
 parser = argparse.ArgumentParser()
@@ -14,12 +12,11 @@ args = parser.parse_args()
 filename = args.filename
 outname = args.outname
 
-all_issues = pd.read_csv(filename, sep="\t")
-pull_requests = all_issues[all_issues["type"] == "pull_request"]
-
-_, num_pull_request_per_authors = np.unique(
-    pull_requests["author_id"],
-    return_counts=True)
+authors, _ = activity.load_activity(filename)
+# pull requests of missing authors are not counted as one contributor
+authors = authors[authors["author_id"].notnull() &
+                  (authors["num_pull_requests"] > 0)]
+num_pull_request_per_authors = authors["num_pull_requests"].values
 
 fig, ax = plt.subplots()
 ax.hist(num_pull_request_per_authors[num_pull_request_per_authors < 100],
@@ -4,57 +4,84 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from glob import glob
-from utils import visualization
+from utils import activity, survival, visualization
 
 
 parser = argparse.ArgumentParser()
-parser.add_argument("--n-pull-request", "-n", default=2, type=int)
-parser.add_argument("--outname", "-o")
+parser.add_argument("--n-pull-request", "-n", default=[2], type=int,
+                    nargs="+",
+                    help="Thresholds on the number of pull requests. One "
+                         "figure is drawn per threshold.")
+parser.add_argument("--outname", "-o",
+                    help="Filename of the figures. With several thresholds, "
+                         "it should contain %%d, replaced by the threshold.")
+parser.add_argument("--table", default=None,
+                    help="TSV file in which the proportion of contributors of "
+                         "each project at each threshold is written")
 args = parser.parse_args()
 
 outname = args.outname
-num_pull_request = args.n_pull_request
-
-filenames = glob("data/raw_data/*/issues.tsv")
-
-fig, ax = plt.subplots()
-labels = []
-survival_proportion = []
-for i, filename in enumerate(filenames):
-    labels.append(filename.split("/")[1])
-    all_issues = pd.read_csv(filename, sep="\t")
-    pull_requests = all_issues[all_issues["type"] == "pull_request"]
-
-    _, num_pull_request_per_authors = np.unique(
-        pull_requests["author_id"],
-        return_counts=True)
-
-    survival_proportion.append(
-        (num_pull_request_per_authors >= num_pull_request).sum() /
-        len(num_pull_request_per_authors))
-
-survival_proportion = np.array(survival_proportion) * 100
-labels = np.array(labels)
-idx = np.argsort(survival_proportion)
-ax.bar(np.arange(len(survival_proportion)), survival_proportion[idx],
-       color="#000000")
-ax.set_xticks(np.arange(len(survival_proportion)))
-ax.set_xticklabels(labels[idx], fontsize="x-small", rotation=30,
-                   horizontalalignment="right")
-visualization.format_ax(ax)
-ax.legend()
-ax.set_title(
-    "Proportion of contributors that opened more than %d pull requests" %
-    num_pull_request,
-    fontweight="bold", fontsize="small")
-ax.set_ylabel("% of contributors", fontsize="small",
-              fontweight="bold")
-
-
-if outname is not None:
+thresholds = args.n_pull_request
+if (outname is not None and len(thresholds) > 1 and
+        "%d" not in outname):
+    parser.error("--outname should contain %d with several thresholds")
+
+filenames = sorted(glob("data/raw_data/*/issues.tsv"))
+
+# Load the activity summary of each project once, and compute the
+# proportions at all thresholds
+proportions = []
+for filename in filenames:
+    project = filename.split("/")[2]
+    authors, _ = activity.load_activity(filename)
+    # pull requests of missing authors are not counted as one contributor
+    authors = authors[authors["author_id"].notnull() &
+                      (authors["num_pull_requests"] > 0)]
+    num_pull_request_per_authors = authors["num_pull_requests"].values
+
+    proportions.append(pd.DataFrame({
+        "project": project,
+        "n_pull_requests": thresholds,
+        "proportion": survival.proportion_at_least(
+            num_pull_request_per_authors, thresholds)}))
+proportions = pd.concat(proportions, ignore_index=True)
+
+if args.table is not None:
     try:
-        os.makedirs(os.path.dirname(outname))
+        os.makedirs(os.path.dirname(args.table))
     except OSError:
         pass
+    proportions.to_csv(args.table, sep="\t", index=False)
+
+for num_pull_request in thresholds:
+    selected = proportions[proportions["n_pull_requests"] == num_pull_request]
+    survival_proportion = selected["proportion"].values * 100
+    labels = selected["project"].values
+
+    fig, ax = plt.subplots()
+    idx = np.argsort(survival_proportion)
+    ax.bar(np.arange(len(survival_proportion)), survival_proportion[idx],
+           color="#000000")
+    ax.set_xticks(np.arange(len(survival_proportion)))
+    ax.set_xticklabels(labels[idx], fontsize="x-small", rotation=30,
+                       horizontalalignment="right")
+    visualization.format_ax(ax)
+    ax.legend()
+    ax.set_title(
+        "Proportion of contributors that opened more than %d pull requests" %
+        num_pull_request,
+        fontweight="bold", fontsize="small")
+    ax.set_ylabel("% of contributors", fontsize="small",
+                  fontweight="bold")
+
+    if outname is not None:
+        filename = outname
+        if "%d" in outname:
+            filename = outname % num_pull_request
+        try:
+            os.makedirs(os.path.dirname(filename))
+        except OSError:
+            pass
 
-    fig.savefig(outname)
+        fig.savefig(filename)
+    plt.close(fig)
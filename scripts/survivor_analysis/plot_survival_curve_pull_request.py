@@ -1,14 +1,17 @@
 import argparse
 import os
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from glob import glob
-from utils import visualization
+from utils import activity, survival, visualization
 
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--outname", "-o")
+parser.add_argument("--censor-window", default=None, type=int,
+                    help="Consider authors who opened a pull request or an "
+                         "issue in the last CENSOR_WINDOW days of the "
+                         "snapshot as still active (Kaplan-Meier estimate)")
 args = parser.parse_args()
 
 outname = args.outname
@@ -18,17 +21,19 @@ filenames = glob("data/*/issues.tsv")
 fig, ax = plt.subplots()
 for filename in filenames:
     label = filename.split("/")[1]
-    all_issues = pd.read_csv(filename, sep="\t")
-    pull_requests = all_issues[all_issues["type"] == "pull_request"]
-
-    _, num_pull_request_per_authors = np.unique(
-        pull_requests["author_id"],
-        return_counts=True)
-
-    survival_data = [
-        ((num_pull_request_per_authors > i).sum() /
-         len(num_pull_request_per_authors))
-        for i in np.arange(0, num_pull_request_per_authors.max() + 1)]
+    authors, _ = activity.load_activity(filename)
+    snapshot = authors["last_activity"].max()
+    # pull requests of missing authors are not counted as one contributor
+    authors = authors[authors["author_id"].notnull() &
+                      (authors["num_pull_requests"] > 0)]
+
+    censored = None
+    if args.censor_window is not None:
+        censored = survival.is_censored(
+            authors["last_activity"], args.censor_window, snapshot=snapshot)
+
+    survival_data = survival.survival_curve(
+        authors["num_pull_requests"].values, censored=censored)
 
     ax.plot(np.arange(len(survival_data)) + 1, survival_data, label=label)
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the scripts import utils from the survivor_analysis folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
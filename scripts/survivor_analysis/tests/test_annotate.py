@@ -0,0 +1,64 @@
+import pandas as pd
+from utils import annotate
+
+
+def _tickets():
+    return pd.DataFrame({
+        "ticket_id": [1, 2],
+        "author_id": [10, 11],
+        "type": ["pull_request", "issue"],
+        "created_at": ["2019-01-01T00:00:00Z", "2019-01-02T00:00:00Z"],
+        "updated_at": ["2019-01-03T00:00:00Z", "2019-01-02T00:00:00Z"],
+        "closed_at": ["2019-01-03T00:00:00Z", None],
+    })
+
+
+def _comments(created_at, ticket_ids):
+    return pd.DataFrame({
+        "ticket_id": ticket_ids,
+        "author_id": [10] * len(ticket_ids),
+        "created_at": created_at,
+        "updated_at": created_at,
+    })
+
+
+def test_annotate_logs_without_tickets():
+    comments = _comments(["2019-01-05T00:00:00Z"], [1])
+    comments, tickets = annotate.annotate_logs(comments, _tickets().iloc[:0])
+    assert len(tickets) == 0
+    assert comments["type"].isnull().all()
+
+
+def test_annotate_logs_incremental_comments_only():
+    tickets = _tickets()
+    old_comments = _comments(["2019-01-04T00:00:00Z"], [1])
+    new_comments = _comments(
+        ["2019-01-05T00:00:00Z", "2019-01-06T00:00:00Z"], [1, 2])
+
+    _, _, state = annotate.annotate_logs_incremental(old_comments, tickets)
+    comments, new_tickets, state = annotate.annotate_logs_incremental(
+        new_comments, tickets.iloc[:0], state)
+
+    expected, _ = annotate.annotate_logs(
+        pd.concat([old_comments, new_comments], ignore_index=True), tickets)
+    expected = expected.iloc[1:].reset_index(drop=True)
+    assert len(new_tickets) == 0
+    for column in ["num_PR_created", "num_issue_created", "comment_order",
+                   "ticket_created_at", "type"]:
+        assert list(comments[column]) == list(expected[column]), column
+    assert state["last_created_at"] == "2019-01-06T00:00:00Z"
+
+
+def test_annotate_logs_open_tickets_in_column_format():
+    comments = _comments(["2019-01-05T00:00:00Z"], [1])
+    tickets = _tickets()
+    for column in ["created_at", "updated_at", "closed_at"]:
+        tickets[column] = tickets[column].str.replace(
+            "T", " ").str.rstrip("Z")
+
+    _, annotated = annotate.annotate_logs(comments, tickets)
+    assert list(annotated["closed_at"]) == ["2019-01-03 00:00:00",
+                                            "2019-01-03 00:00:00"]
+    assert list(annotated["open_duration"]) == [2 * 24 * 3600,
+                                                24 * 3600]
+    assert tickets["closed_at"].isnull().sum() == 1
@@ -1,3 +1,11 @@
 from . import visualization
 from . import annotate
 from . import project_features
+from . import sentiment_cache
+from . import data_io
+from . import concentration
+from . import survival
+from . import cache
+from . import activity
+from . import timeseries
+from . import parallel
@@ -0,0 +1,141 @@
+import os
+import numpy as np
+import pandas as pd
+from . import cache, data_io
+from .annotate import _NAT, compute_open_duration, latest_timestamp
+from .annotate import to_epoch_ns
+
+
+# columns of the tickets needed to compute the activity summary
+TICKET_COLUMNS = ["ticket_id", "author_id", "type", "created_at", "updated_at",
+                  "closed_at"]
+
+# version of compute_activity, to bump when its output changes so that cached
+# summaries are computed again
+_VERSION = 3
+
+
+def compute_activity(tickets, as_of=None):
+    """
+    Summarize the activity of the authors and tickets of a project
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    tickets : pd.DataFrame
+        Tickets of the project, with the columns of TICKET_COLUMNS
+
+    as_of : str or pd.Timestamp, optional, default: None
+        Date at which the data was collected, see `annotate.annotate_logs()`
+
+    Returns
+    -------
+    authors : pd.DataFrame
+        One row per author, with the author_id, the number of pull requests
+        and issues opened (num_pull_requests, num_issues) and the dates of
+        the first and last tickets opened (first_activity, last_activity).
+        Tickets without author are gathered in a single row with a missing
+        author_id.
+
+    tickets : pd.DataFrame
+        One row per ticket, with the ticket_id, type, created_at, closed_at
+        (missing for open tickets), is_closed and open_duration columns. As in
+        `annotate.annotate_logs()`, open_duration is in seconds, and open
+        tickets are considered closed at the as-of date.
+    """
+    created_at = to_epoch_ns(tickets["created_at"])
+    closed_at = to_epoch_ns(tickets["closed_at"])
+    if as_of is None:
+        as_of = latest_timestamp(
+            tickets, parsed={"created_at": created_at, "closed_at": closed_at})
+    as_of = pd.Timestamp(as_of)
+    if as_of.tzinfo is None and not pd.isnull(as_of):
+        as_of = as_of.tz_localize("UTC")
+
+    # tickets without author form their own group
+    author_codes, author_ids = pd.factorize(tickets["author_id"])
+    n_authors = len(author_ids)
+    has_missing_author = (author_codes == -1).any()
+    if has_missing_author:
+        author_codes = np.where(author_codes == -1, n_authors, author_codes)
+        n_authors += 1
+
+    is_pull_request = (tickets["type"] == "pull_request").values
+    is_issue = (tickets["type"] == "issue").values
+    first_activity = np.full(n_authors, np.iinfo(np.int64).max)
+    last_activity = np.full(n_authors, _NAT)
+    valid = created_at != _NAT
+    np.minimum.at(first_activity, author_codes[valid], created_at[valid])
+    np.maximum.at(last_activity, author_codes[valid], created_at[valid])
+    first_activity[first_activity == np.iinfo(np.int64).max] = _NAT
+
+    author_ids = pd.Series(author_ids)
+    if has_missing_author:
+        author_ids = pd.concat(
+            [author_ids, pd.Series([None], dtype=author_ids.dtype)],
+            ignore_index=True)
+    authors = pd.DataFrame({
+        "author_id": author_ids.values,
+        "num_pull_requests": np.bincount(
+            author_codes[is_pull_request], minlength=n_authors),
+        "num_issues": np.bincount(
+            author_codes[is_issue], minlength=n_authors),
+        "first_activity": pd.to_datetime(first_activity, utc=True),
+        "last_activity": pd.to_datetime(last_activity, utc=True),
+    })
+
+    is_closed = closed_at != _NAT
+    open_duration = compute_open_duration(created_at, closed_at, as_of)
+    tickets = pd.DataFrame({
+        "ticket_id": tickets["ticket_id"].values,
+        "type": pd.Categorical(tickets["type"]),
+        "created_at": pd.to_datetime(created_at, utc=True),
+        "closed_at": pd.to_datetime(closed_at, utc=True),
+        "is_closed": is_closed,
+        "open_duration": open_duration,
+    })
+    return authors, tickets
+
+
+def load_activity(filename, cachedir=".cache/activity", check="mtime"):
+    """
+    Load the activity summary of a project, computing it if needed
+
+    The summary computed by `compute_activity()` is stored in cachedir, and
+    computed again only when the tickets file changes.
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    filename : str
+        tickets.tsv or issues.tsv file of the project
+
+    cachedir : str, optional, default: ".cache/activity"
+        Folder in which the summaries are stored
+
+    check : {"mtime", "hash"}, optional, default: "mtime"
+        How changes of the tickets file are detected, see
+        `cache.file_fingerprint()`
+
+    Returns
+    -------
+    authors, tickets : pd.DataFrame
+        See `compute_activity()`
+
+    Examples
+    --------
+    >> from utils import activity
+    >> authors, tickets = activity.load_activity(
+    >>     "data/raw_data/numpy/issues.tsv")
+    >> num_pull_request_per_authors = authors.loc[
+    >>     authors["num_pull_requests"] > 0, "num_pull_requests"].values
+    """
+    def compute():
+        return compute_activity(
+            data_io.read_github_tsv(filename, columns=TICKET_COLUMNS))
+
+    return cache.cached(compute, os.path.abspath(filename),
+                        cache.file_fingerprint(filename, check), cachedir,
+                        version=_VERSION)
@@ -1,13 +1,43 @@
 import pandas as pd
 import numpy as np
-from collections import Counter
-from datetime import datetime
-from nltk.tokenize import RegexpTokenizer
+import os
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import re
+from . import parallel
 
 
-def annotate_logs(comments, tickets):
+# keys of the VADER scores, and the columns in which they are stored
+SENTIMENT_KEYS = ["neg", "neu", "pos", "compound"]
+SENTIMENT_COLUMNS = ["negative_emotion", "neutral_emotion",
+                     "positive_emotion", "compound_emotion"]
+
+# columns returned by clean_bodies
+CLEANUP_COLUMNS = ["body", "html_comments", "automatic_grateful_count",
+                   "automatic_grateful_list", "code_blocks",
+                   "referenced_users"]
+
+# patterns used to clean up the bodies, see clean_body
+_HTML_COMMENT_LINE = re.compile(r"(\<\!--.*?--\>)")
+_HTML_COMMENT = re.compile(r"(<!--.*?-->)", flags=re.DOTALL)
+_QUOTE = re.compile(r"(^|\n|\r)+\>.*(?=\n|$)")
+_NEWLINES = re.compile(r"[\n\r]+")
+_CODE_FENCE = re.compile(r"\`{3}")
+_CODE_BLOCK = re.compile(r"\`{3}.*\`{3}")
+_USER_MENTION = re.compile(r"@\w{1,}")
+_WORD = re.compile(r"\w+")
+
+# timestamps as int64 nanoseconds since the epoch
+_NAT = np.iinfo(np.int64).min
+_END_OF_1970 = pd.Timestamp("1971-01-01").value
+
+# formats of the UTC dates of the GitHub data, tried to write dates in the
+# format of the other dates of a column
+_DATE_FORMATS = ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S",
+                 "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S+00:00",
+                 "%Y-%m-%dT%H:%M:%S+00:00"]
+
+
+def annotate_logs(comments, tickets, as_of=None):
     """
     Annotates comments and tickets with additional information:
 
@@ -26,9 +56,18 @@ def annotate_logs(comments, tickets):
 
     tickets : pd.DataFrame
 
+    as_of : str or pd.Timestamp, optional, default: None
+        Date at which the data was collected, used as the closing date of
+        tickets that are still open. Defaults to the most recent timestamp of
+        the tickets, or of the comments if there is no ticket (see
+        `latest_timestamp()`), so that the annotations do not depend on when
+        they are computed. When the dates are strings, the as-of date is
+        written in the format of the other dates.
+
     Returns
     -------
-    The same dataframe, but with additional columns
+    Copies of the dataframes, but with additional columns. The input
+    dataframes are left unchanged.
 
     Examples
     --------
@@ -39,84 +78,408 @@ def annotate_logs(comments, tickets):
     >> comments, tickets = utils.annotate_logs(comments, tickets)
     """
 
+    # Work on shallow copies, so that the caller's dataframes are left
+    # unchanged without copying the bodies: new columns are only added to
+    # the copies, and the only column modified in place is copied below.
+    comments = comments.copy(deep=False)
+    tickets = tickets.copy(deep=False)
+
     # identify whether the body of comments or tickets were updated
     comments["was_updated"] = comments["created_at"] != comments["updated_at"]
     tickets["was_updated"] = tickets["created_at"] != tickets["updated_at"]
 
-    # comments df: add number of PRs created by author to date
-    num_PR_per_pers = [
-        sum((tickets["created_at"] < created_at) &
-            (tickets["type"] == "pull_request") &
-            (tickets["author_id"] == author_id))
-        for created_at, author_id
-        in zip(comments["created_at"], comments["author_id"])]
-    comments["num_PR_created"] = num_PR_per_pers
-
-    # issues df: add number of PRs created by author to date
-    num_PR_per_pers = [
-        sum((tickets["created_at"] < created_at) &
-            (tickets["type"] == "pull_request") &
-            (tickets["author_id"] == author_id))
-        for created_at, author_id
-        in zip(tickets["created_at"], tickets["author_id"])]
-    tickets["num_PR_created"] = num_PR_per_pers
-
-    # comments df: add number of issues created by author to date
-    num_issue_per_pers = [
-        sum((tickets["created_at"] < created_at) &
-            (tickets["type"] == "issue") &
-            (tickets["author_id"] == author_id))
-        for created_at, author_id
-        in zip(comments["created_at"], comments["author_id"])]
-    comments["num_issue_created"] = num_issue_per_pers
-
-    # tickets df: add number of issues created by author to date
-    num_issue_per_pers = [
-        sum((tickets["created_at"] < created_at) &
-            (tickets["type"] == "issue") &
-            (tickets["author_id"] == author_id))
-        for created_at, author_id
-        in zip(tickets["created_at"], tickets["author_id"])]
-    tickets["num_issue_created"] = num_issue_per_pers
+    # count the number of PRs and issues created by each author before each
+    # comment and each ticket
+    for ticket_type, column in [("pull_request", "num_PR_created"),
+                                ("issue", "num_issue_created")]:
+        comments[column] = count_prior_tickets(
+            tickets, comments["created_at"], comments["author_id"],
+            ticket_type)
+        tickets[column] = count_prior_tickets(
+            tickets, tickets["created_at"], tickets["author_id"],
+            ticket_type)
 
     # track the comment order
     comments['comment_order'] = comments.sort_values(by=['created_at']) \
                                         .groupby(by=['ticket_id']) \
                                         .cumcount()
 
-    # identify whether the PR is closed
-    tickets['is_closed'] = pd.notnull(tickets['closed_at'])
-    mask = tickets["closed_at"].isnull()
-    tickets.loc[mask, "closed_at"] = pd.to_datetime(datetime.now())
-    open_duration = (
-        pd.to_datetime(tickets["closed_at"]) -
-        pd.to_datetime(tickets["created_at"]))
-    tickets["open_duration"] = open_duration.apply(
-        lambda x: x.total_seconds())
-
-    # Now we want to remove this estimate for anything created before 1970
-    m = [True if c.startswith("1970") else False
-         for c in tickets["created_at"]]
-    tickets.loc[m, "open_duration"] = np.nan
+    # identify whether the PR is closed. Open tickets are considered closed
+    # at the as-of date, so that their open duration is a lower bound.
+    created_at = to_epoch_ns(tickets["created_at"])
+    closed_at = to_epoch_ns(tickets["closed_at"])
+    is_open = closed_at == _NAT
+    tickets['is_closed'] = ~is_open
+    if as_of is None:
+        as_of = latest_timestamp(
+            tickets, parsed={"created_at": created_at, "closed_at": closed_at})
+    if pd.isnull(as_of):
+        # no ticket timestamp, e.g. an incremental update with comments only
+        as_of = latest_timestamp(comments)
+    as_of = pd.Timestamp(as_of)
+    if as_of.tzinfo is None and not pd.isnull(as_of):
+        as_of = as_of.tz_localize("UTC")
+    if is_open.any() and not pd.isnull(as_of):
+        tickets["closed_at"] = _fill_timestamps(
+            tickets["closed_at"], is_open, as_of,
+            samples=[tickets["closed_at"], tickets["created_at"]])
+    tickets["open_duration"] = compute_open_duration(
+        created_at, closed_at, as_of)
 
     # For each comment, get the information on when the corresponding ticket
     # has been opened when it is available (comments can also be added to
     # commits)
-    tickets.set_index("ticket_id", inplace=True, drop=False)
-
-    # We're using the reindex function to tacket the case where we don't have
-    # the ticket associated to a particular comment.
-    comments["ticket_created_at"] = tickets.reindex(
-        comments["ticket_id"])["created_at"].values
-    comments["type"] = tickets.reindex(
-        comments["ticket_id"])["type"].values
-    # Reset the old index
-    tickets.set_index("id", inplace=True, drop=False)
+    ticket_attributes = gather_ticket_attributes(
+        tickets, comments["ticket_id"], ["created_at", "type"])
+    comments["ticket_created_at"] = ticket_attributes["created_at"]
+    comments["type"] = ticket_attributes["type"]
 
     # return the dataframes
     return comments, tickets
 
 
+def to_epoch_ns(timestamps):
+    """
+    Parse timestamps into nanoseconds since the epoch (UTC)
+
+    Parameters
+    ----------
+    timestamps : pd.Series
+        Timestamps, either as strings or as datetimes
+
+    Returns
+    -------
+    np.ndarray of int64
+        Missing timestamps are set to the smallest int64 (NaT).
+    """
+    return pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True)).asi8.copy()
+
+
+def compute_open_duration(created_at, closed_at, as_of):
+    """
+    Number of seconds during which each ticket was open
+
+    Open tickets are considered closed at the as-of date, so that their open
+    duration is a lower bound.
+
+    Parameters
+    ----------
+    created_at, closed_at : np.ndarray of int64
+        Creation and closing dates of the tickets, as returned by
+        `to_epoch_ns()`. Open tickets have no closing date.
+
+    as_of : pd.Timestamp
+        Date at which the data was collected. If NaT, open tickets have no
+        open duration.
+
+    Returns
+    -------
+    np.ndarray of float
+        Missing for tickets without creation date, and for tickets created in
+        1970, which is the date GitHub reports when it does not know the
+        creation date.
+    """
+    closed_at = np.where(closed_at == _NAT,
+                         _NAT if pd.isnull(as_of) else as_of.value,
+                         closed_at)
+    open_duration = (closed_at - created_at) / 1e9
+    open_duration[(created_at == _NAT) | (closed_at == _NAT)] = np.nan
+    open_duration[created_at < _END_OF_1970] = np.nan
+    return open_duration
+
+
+def _fill_timestamps(timestamps, mask, timestamp, samples):
+    # Copy of timestamps, with timestamp written where mask is True. String
+    # columns are filled in the format of the first date of samples that one
+    # of _DATE_FORMATS reproduces, or converted to datetimes if there is none.
+    timestamps = timestamps.copy()
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        date_format = None
+        for sample in samples:
+            sample = sample.dropna()
+            if len(sample) and isinstance(sample.iloc[0], str):
+                date_format = _guess_date_format(sample.iloc[0])
+            if date_format is not None:
+                timestamps[mask] = timestamp.strftime(date_format)
+                return timestamps
+        timestamps = pd.to_datetime(timestamps, utc=True)
+    timestamps[mask] = timestamp
+    return timestamps
+
+
+def _guess_date_format(date):
+    # Format of _DATE_FORMATS in which a UTC date is written, or None
+    try:
+        parsed = pd.Timestamp(date)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None and parsed.utcoffset():
+        return None
+    for date_format in _DATE_FORMATS:
+        if parsed.strftime(date_format) == date:
+            return date_format
+    return None
+
+
+def latest_timestamp(tickets, parsed=None):
+    """
+    Returns the most recent created_at, updated_at or closed_at timestamp of
+    the tickets (or comments), as a UTC pd.Timestamp
+
+    Returns NaT if there is no timestamp, for example if there is no ticket.
+
+    Parameters
+    ----------
+    tickets : pd.DataFrame
+
+    parsed : dict, optional, default: None
+        Columns already parsed with `to_epoch_ns()`, by name. They are used
+        as is rather than parsed again.
+    """
+    if parsed is None:
+        parsed = {}
+    latest = _NAT
+    for column in ["created_at", "updated_at", "closed_at"]:
+        if column in parsed:
+            timestamps = parsed[column]
+        elif column in tickets.columns:
+            timestamps = to_epoch_ns(tickets[column])
+        else:
+            continue
+        if len(timestamps):
+            latest = max(latest, timestamps.max())
+    if latest == _NAT:
+        return pd.NaT
+    return pd.Timestamp(latest, tz="UTC")
+
+
+def annotate_logs_incremental(comments, tickets, state=None,
+                              as_of=None):
+    """
+    Annotates new comments and tickets, given the state of previous runs
+
+    Gives the same num_PR_created, num_issue_created, comment_order,
+    ticket_created_at and type columns as running `annotate_logs()` on the
+    full history, but only processes the new rows. The other columns are
+    computed on the new rows only: in particular, tickets of previous runs
+    that have been closed since are not updated.
+
+    Requires: pandas
+
+    Parameters
+    ----------
+    comments : pd.DataFrame
+        Comments created since the previous run
+
+    tickets : pd.DataFrame
+        Tickets created since the previous run
+
+    state : dict, optional, default: None
+        State returned by the previous run, or loaded with
+        `load_annotation_state()`. None for the first run.
+
+    as_of : str or pd.Timestamp, optional, default: None
+        See `annotate_logs()`.
+
+    Returns
+    -------
+    comments, tickets : pd.DataFrame
+        Copies of the new comments and tickets, with additional columns
+
+    state : dict
+        Updated state, to be saved with `save_annotation_state()` and passed
+        to the next run
+
+    Examples
+    --------
+    >> state = utils.annotate.load_annotation_state("numpy-state.pkl")
+    >> comments, tickets, state = utils.annotate.annotate_logs_incremental(
+    >>     new_comments, new_tickets, state)
+    >> utils.annotate.save_annotation_state(state, "numpy-state.pkl")
+    """
+    if state is None:
+        state = {
+            "author_counts": pd.DataFrame(
+                columns=["num_PR_created", "num_issue_created"],
+                dtype=np.int64),
+            "comment_counts": pd.Series(dtype=np.int64),
+            "tickets": pd.DataFrame(
+                columns=["ticket_id", "created_at", "type"]),
+            "last_created_at": None,
+        }
+
+    # Running counters are only valid if the new rows are strictly more
+    # recent than all the rows of the previous runs.
+    last_created_at = state["last_created_at"]
+    if last_created_at is not None:
+        for frame in (comments, tickets):
+            if (frame["created_at"] <= last_created_at).any():
+                raise ValueError(
+                    "All new comments and tickets should be created after "
+                    "the last row of the previous run (%s)" %
+                    last_created_at)
+
+    comments, tickets = annotate_logs(comments, tickets, as_of=as_of)
+
+    # Add the PRs and issues opened by each author in previous runs
+    author_counts = state["author_counts"]
+    for column in ["num_PR_created", "num_issue_created"]:
+        for frame in (comments, tickets):
+            frame[column] = frame[column] + author_counts[column].reindex(
+                frame["author_id"]).fillna(0).astype(np.int64).values
+
+    # Add the comments made on each ticket in previous runs
+    comments["comment_order"] = (
+        comments["comment_order"] +
+        state["comment_counts"].reindex(
+            comments["ticket_id"]).fillna(0).astype(np.int64).values)
+
+    # Comments on tickets opened in previous runs
+    previous = gather_ticket_attributes(
+        state["tickets"], comments["ticket_id"], ["created_at", "type"])
+    mask = comments["type"].isnull() & previous["type"].notnull()
+    comments.loc[mask, "ticket_created_at"] = previous.loc[mask, "created_at"]
+    comments.loc[mask, "type"] = previous.loc[mask, "type"]
+
+    # Update the state with the new rows
+    new_author_counts = pd.DataFrame({
+        column: (tickets["type"] == ticket_type).groupby(
+            tickets["author_id"]).sum().astype(np.int64)
+        for ticket_type, column in [("pull_request", "num_PR_created"),
+                                    ("issue", "num_issue_created")]})
+    created_at = pd.concat(
+        [comments["created_at"], tickets["created_at"]]).dropna()
+    if len(created_at):
+        last_created_at = created_at.max()
+    state = {
+        "author_counts": author_counts.add(
+            new_author_counts, fill_value=0).astype(np.int64),
+        "comment_counts": state["comment_counts"].add(
+            comments.groupby("ticket_id").size(),
+            fill_value=0).astype(np.int64),
+        "tickets": pd.concat(
+            [state["tickets"], tickets[["ticket_id", "created_at", "type"]]],
+            ignore_index=True).drop_duplicates("ticket_id", keep="last"),
+        "last_created_at": last_created_at,
+    }
+    return comments, tickets, state
+
+
+def save_annotation_state(state, filename):
+    """
+    Save the state returned by `annotate_logs_incremental()`
+    """
+    pd.to_pickle(state, filename)
+
+
+def load_annotation_state(filename):
+    """
+    Load a state saved with `save_annotation_state()`
+
+    Returns None if the file does not exist, so that the first run
+    annotates the full history.
+    """
+    if not os.path.exists(filename):
+        return None
+    return pd.read_pickle(filename)
+
+
+def count_prior_tickets(tickets, created_at, author_id, ticket_type):
+    """
+    Count the number of tickets of a given type opened by each author
+    strictly before a given time.
+
+    Tickets are sorted once by (author_id, created_at), so that each query is
+    answered with a binary search instead of a scan of the full ticket table.
+
+    Requires: pandas , numpy
+
+    Parameters
+    ----------
+    tickets : pd.DataFrame
+        Tickets, with "created_at", "author_id" and "type" columns.
+
+    created_at : pd.Series or array-like
+        Time of each query (e.g., comment or ticket creation time). Must be
+        comparable with tickets["created_at"].
+
+    author_id : pd.Series or array-like
+        Author of each query.
+
+    ticket_type : {"pull_request", "issue"}
+        Type of tickets to count.
+
+    Returns
+    -------
+    counts : np.ndarray of int, same length as created_at
+        Number of tickets of type `ticket_type` created by `author_id` strictly
+        before `created_at`. Queries with missing author or time return 0.
+    """
+    created_at = np.asarray(created_at)
+    author_id = np.asarray(author_id)
+    mask = np.asarray(tickets["type"] == ticket_type)
+    num_tickets = mask.sum()
+
+    # Encode authors and times as integer codes shared between the tickets
+    # and the queries. Sorted factorization preserves the ordering of times,
+    # and missing values are encoded as -1.
+    author_codes, _ = pd.factorize(
+        np.concatenate([np.asarray(tickets["author_id"])[mask], author_id]),
+        sort=True)
+    time_codes, time_uniques = pd.factorize(
+        np.concatenate([np.asarray(tickets["created_at"])[mask], created_at]),
+        sort=True)
+
+    # Combine both codes in a single int64 key, sorted by author then time.
+    n_times = len(time_uniques) + 1
+    keys = author_codes.astype(np.int64) * n_times + time_codes
+    valid = (author_codes >= 0) & (time_codes >= 0)
+
+    ticket_keys = np.sort(keys[:num_tickets][valid[:num_tickets]])
+    query_keys = keys[num_tickets:]
+    # Tickets of that author created strictly before the query time are those
+    # between the first key of the author's block and the query's key.
+    author_start = author_codes[num_tickets:].astype(np.int64) * n_times
+    counts = (np.searchsorted(ticket_keys, query_keys, side="left") -
+              np.searchsorted(ticket_keys, author_start, side="left"))
+    counts[~valid[num_tickets:]] = 0
+    return counts
+
+
+def gather_ticket_attributes(tickets, ticket_ids, columns):
+    """
+    Look up attributes of the ticket of each comment
+
+    The position of each ticket is computed once, and all columns are then
+    gathered with a single take, without modifying the tickets dataframe.
+
+    Requires: pandas
+
+    Parameters
+    ----------
+    tickets : pd.DataFrame
+        Tickets, with a unique "ticket_id" column.
+
+    ticket_ids : pd.Series
+        Ticket of each comment.
+
+    columns : list of str
+        Columns of the tickets dataframe to gather.
+
+    Returns
+    -------
+    pd.DataFrame, with the same index as ticket_ids
+        Attributes of the ticket of each comment. Missing values for comments
+        whose ticket is not in the tickets dataframe (e.g., comments on
+        commits).
+    """
+    positions = pd.Index(tickets["ticket_id"]).get_indexer(ticket_ids)
+    return pd.DataFrame(
+        {column: tickets[column].array.take(positions, allow_fill=True)
+         for column in columns},
+        index=ticket_ids.index)
+
+
 def body_cleanup(comments, grateful_list, bot_list):
     """
     Prepare comment or issue dataframe for text analysis:
@@ -131,15 +494,15 @@ def body_cleanup(comments, grateful_list, bot_list):
     6. Identify other users referenced in body
     7. Flag whether the author was a bot
 
-    Requires: pandas , nltk , collections , re
+    Requires: pandas , re
 
     Parameters
     ----------
     comments : pd.DataFrame, ideally annotated with `annotate_logs()`;
         can be run with either comments df or issues/tickets df
         
-    grateful_list : list or pd.Series of gratitude words to identify;
-        currently works only with grateful unigrams
+    grateful_list : list or set of gratitude expressions to identify in
+        HTML comments; expressions can span several words
 
     bot_list : list or pd.Series of bot usernames to be ignored
 
@@ -160,51 +523,14 @@ def body_cleanup(comments, grateful_list, bot_list):
     # replace all NaN with empty strings
     comments['body'] = comments['body'].replace(np.nan, '', regex=True)
     
-    # count thanks in HTML comments
-    comments['html_comments'] = comments['body'].str.findall('(\<\!--.*?--\>)').apply(' '.join)
-    
-    # tokenize and count words
-    tokenizer = RegexpTokenizer(r'\w+')
-    comments['html_tokenized'] = comments['html_comments'].apply(str.lower).apply(tokenizer.tokenize)
-    comments['html_word_count'] = comments['html_tokenized'].apply(lambda x: Counter(x))
-
-    # count words if they're in our grateful list
-    comments['automatic_grateful_count'] = (
-        comments['html_word_count'].apply(
-            lambda x: np.sum([v for k, v in x.items()
-                              if k in grateful_list])))
-
-    # let us know which ones were used
-    comments['automatic_grateful_list'] = (
-        comments['html_word_count'].apply(
-            lambda x: [k for k in x if k in grateful_list]))
-
-    # remove the columns we don't need anymore
-    comments = comments.drop(columns=['html_tokenized', 
-                                      'html_word_count'])
-    
-    # remove the HTML comments from the body
-    comments['body'] = (comments['body'].str.replace(
-        "(<!--.*?-->)", " ",
-        regex=True,
-        flags=re.DOTALL))
-    
-    # remove text quotes
-    comments['body'] = (comments['body'].replace(
-        "(^|\n|\r)+\>.*(?=\n|$)", " ",
-        regex=True))
-
-    # remove newlines
-    comments['body'] = (comments['body'].replace(
-        "[\n\r]+", " ", regex=True))
-
-    # count and then remove code blocks
-    comments['code_blocks'] = comments['body'].str.count("\`{3}")/2
-    comments['body'] = (comments['body'].replace(
-        "\`{3}.*\`{3}", " ", regex=True))
-
+    # clean up each body in a single pass: count thanks in HTML comments,
+    # remove HTML comments, text quotes, newlines and code blocks, and
     # identify other humans
-    comments['referenced_users'] = comments['body'].str.findall('@\w{1,}')
+    cleaned = clean_bodies(comments['body'], grateful_list)
+    for column in ['html_comments', 'automatic_grateful_count',
+                   'automatic_grateful_list', 'body', 'code_blocks',
+                   'referenced_users']:
+        comments[column] = cleaned[column]
 
     # identify bots
     comments['bot_flag'] = comments['author_name'].isin(bot_list)
@@ -213,7 +539,254 @@ def body_cleanup(comments, grateful_list, bot_list):
     return comments
 
 
-def add_sentiment(comments):
+def clean_body(body, grateful_pattern):
+    """
+    Clean up a single comment or issue body for text analysis
+
+    Applies the same steps as `body_cleanup()`, with precompiled patterns.
+
+    Parameters
+    ----------
+    body : str
+
+    grateful_pattern : pattern compiled with `compile_gratitude()`, matching
+        the gratitude expressions to identify in HTML comments
+
+    Returns
+    -------
+    body : str
+        The cleaned body
+
+    html_comments : str
+        The HTML comments of the body, joined with spaces
+
+    automatic_grateful_count : float
+        Number of gratitude words in the HTML comments
+
+    automatic_grateful_list : list of str
+        Gratitude words used in the HTML comments
+
+    code_blocks : float
+        Number of code blocks in the body
+
+    referenced_users : list of str
+        Users referenced in the body
+    """
+    html_comments = ' '.join(_HTML_COMMENT_LINE.findall(body))
+    automatic_grateful_count, automatic_grateful_list = count_gratitude(
+        html_comments.lower(), grateful_pattern)
+
+    body = _HTML_COMMENT.sub(" ", body)
+    body = _QUOTE.sub(" ", body)
+    body = _NEWLINES.sub(" ", body)
+    code_blocks = len(_CODE_FENCE.findall(body)) / 2
+    body = _CODE_BLOCK.sub(" ", body)
+    referenced_users = _USER_MENTION.findall(body)
+
+    return (body, html_comments, float(automatic_grateful_count),
+            automatic_grateful_list, code_blocks, referenced_users)
+
+
+def clean_bodies(bodies, grateful_list):
+    """
+    Clean up a column of comment or issue bodies for text analysis
+
+    Vectorised entry point of `clean_body()`: each body is processed in a
+    single pass, and all derived fields are returned at once.
+
+    Parameters
+    ----------
+    bodies : pd.Series of str, without NaN
+
+    grateful_list : list or set of gratitude expressions to identify in HTML
+        comments, or pattern compiled with `compile_gratitude()`
+
+    Returns
+    -------
+    pd.DataFrame, with the same index as `bodies` and columns body,
+    html_comments, automatic_grateful_count, automatic_grateful_list,
+    code_blocks and referenced_users
+    """
+    grateful_pattern = compile_gratitude(grateful_list)
+    cleaned = pd.DataFrame(
+        [clean_body(body, grateful_pattern) for body in bodies],
+        columns=CLEANUP_COLUMNS, index=bodies.index)
+    cleaned['automatic_grateful_count'] = (
+        cleaned['automatic_grateful_count'].astype(float))
+    cleaned['code_blocks'] = cleaned['code_blocks'].astype(float)
+    return cleaned
+
+
+def compile_gratitude(grateful_list):
+    """
+    Compile a list of gratitude expressions into a single pattern
+
+    Expressions are matched as whole words on lower case text, which is
+    equivalent to tokenizing the text with `\\w+` and looking up each token.
+    Multi-word expressions (e.g., "thank you") match words separated by any
+    non-word characters. When expressions overlap, the longest one wins.
+
+    Parameters
+    ----------
+    grateful_list : list, set or pd.Series of gratitude expressions, or a
+        pattern already compiled with this function
+
+    Returns
+    -------
+    grateful_pattern : compiled regular expression, to be used with
+        `count_gratitude()`
+    """
+    if isinstance(grateful_list, re.Pattern):
+        return grateful_list
+
+    expressions = set(
+        tuple(_WORD.findall(str(expression).lower()))
+        for expression in grateful_list)
+    expressions = sorted((e for e in expressions if e),
+                         key=lambda e: (-len(" ".join(e)), e))
+    if not expressions:
+        # Nothing to match
+        return re.compile(r"(?!)")
+    return re.compile(
+        r"(?<!\w)(?:%s)(?!\w)" % "|".join(
+            r"\W+".join(re.escape(word) for word in expression)
+            for expression in expressions))
+
+
+def count_gratitude(text, grateful_pattern):
+    """
+    Count the expressions of gratitude in a lower case text
+
+    Parameters
+    ----------
+    text : str
+
+    grateful_pattern : pattern compiled with `compile_gratitude()`
+
+    Returns
+    -------
+    count : int
+        Number of expressions of gratitude in the text
+
+    used : list of str
+        Expressions of gratitude used in the text, in order of first
+        appearance
+    """
+    count = 0
+    used = {}
+    for match in grateful_pattern.finditer(text):
+        count += 1
+        used[" ".join(_WORD.findall(match.group()))] = None
+    return count, list(used)
+
+
+def score_sentiment(bodies, analyser=None, n_jobs=1, cache=None, pool=None):
+    """
+    Compute the VADER sentiment scores of each body
+
+    Requires: numpy , vaderSentiment
+
+    Parameters
+    ----------
+    bodies : pd.Series or list of str
+
+    analyser : SentimentIntensityAnalyzer, optional
+        If not provided, a new analyzer is created. Ignored when running in
+        parallel: each worker process then creates its own analyzer.
+
+    n_jobs : int, optional, default: 1
+        Number of processes used to score the bodies. -1 uses all CPUs.
+
+    cache : sentiment_cache.SentimentCache, optional
+        If provided, only the bodies missing from the cache are scored, and
+        their scores are added to the cache.
+
+    pool : multiprocessing.Pool, optional
+        Pool created with `create_sentiment_pool()`, reused to score the
+        bodies instead of creating a new pool of n_jobs processes.
+
+    Returns
+    -------
+    scores : np.ndarray of float64, shape (n_bodies, 4)
+        Negative, neutral, positive and compound scores of each body, in the
+        order of SENTIMENT_KEYS.
+    """
+    if cache is not None:
+        bodies = list(bodies)
+        keys = cache.hash(bodies)
+        scores, found = cache.get(keys)
+        if not found.all():
+            # Score each distinct missing body only once
+            missing = {}
+            for i in np.flatnonzero(~found):
+                missing.setdefault(keys[i], i)
+            new_scores = score_sentiment(
+                [bodies[i] for i in missing.values()], analyser,
+                n_jobs=n_jobs, pool=pool)
+            cache.set(list(missing.keys()), new_scores)
+            new_scores = dict(zip(missing.keys(), new_scores))
+            for i in np.flatnonzero(~found):
+                scores[i] = new_scores[keys[i]]
+        return scores
+
+    n_jobs = parallel.effective_n_jobs(n_jobs)
+    if len(bodies) > 1 and (pool is not None or n_jobs > 1):
+        # Split the bodies in a few chunks per worker, to balance the load,
+        # and reassemble the scores in the original order.
+        bodies = list(bodies)
+        n_chunks = 4 * n_jobs
+        bounds = np.linspace(0, len(bodies), n_chunks + 1).astype(int)
+        chunks = [bodies[start:end]
+                  for start, end in zip(bounds[:-1], bounds[1:])
+                  if end > start]
+        if pool is not None:
+            return np.concatenate(pool.map(_score_sentiment_chunk, chunks))
+        with create_sentiment_pool(n_jobs) as pool:
+            return np.concatenate(pool.map(_score_sentiment_chunk, chunks))
+
+    if analyser is None:
+        analyser = SentimentIntensityAnalyzer()
+
+    scores = np.empty((len(bodies), len(SENTIMENT_KEYS)), dtype=np.float64)
+    for i, body in enumerate(bodies):
+        polarity = analyser.polarity_scores(body)
+        for j, key in enumerate(SENTIMENT_KEYS):
+            scores[i, j] = polarity[key]
+    return scores
+
+
+def _sentiment_worker_state():
+    # each worker process creates its own analyzer
+    return {"analyser": SentimentIntensityAnalyzer()}
+
+
+def _score_sentiment_chunk(bodies):
+    return score_sentiment(bodies, parallel.worker_state["analyser"])
+
+
+def create_sentiment_pool(n_jobs):
+    """
+    Create a pool of processes scoring sentiment
+
+    The pool can be passed to `score_sentiment()` and `add_sentiment()`, to
+    be shared by several calls, for example on the chunks of a large file.
+    It should be closed by the caller.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Number of processes. -1 uses all CPUs.
+
+    Returns
+    -------
+    multiprocessing.Pool, or None if n_jobs is 1
+    """
+    if parallel.effective_n_jobs(n_jobs) <= 1:
+        return None
+    return parallel.create_pool(n_jobs, initializer=_sentiment_worker_state)
+
+
+def add_sentiment(comments, n_jobs=1, cache=None, pool=None):
     """
     Add sentiment analysis scores to comments dataframe:
     * negative emotion
@@ -231,6 +804,18 @@ def add_sentiment(comments):
         ideally after `annotate_logs()` and `body_cleanup()`;
         can be run with either comments df or issues/tickets df
 
+    n_jobs : int, optional, default: 1
+        Number of processes used to run the sentiment analyzer. -1 uses all
+        CPUs. The scores are identical to the ones computed serially.
+
+    cache : sentiment_cache.SentimentCache, optional
+        Persistent cache of scores. If provided, only the bodies that are not
+        in the cache are run through the sentiment analyzer.
+
+    pool : multiprocessing.Pool, optional
+        Pool created with `create_sentiment_pool()`, reused to run the
+        sentiment analyzer.
+
     Returns
     -------
     The same dataframe but with new sentiment columns
@@ -245,30 +830,15 @@ def add_sentiment(comments):
     >> comments = utils.annotate.add_sentiment(comments)
     """
 
-    # initialize sentiment analyzer
-    analyser = SentimentIntensityAnalyzer()
-
     # remove NaNs
     comments['body'] = comments['body'].replace(np.nan, ' ', regex=True)
 
-    # run sentiment analyzer over each comment body
-    sentiment_df = (
-        comments['body']
-        .apply(analyser.polarity_scores)
-        .astype(str)
-        .str.strip('{}')
-        .str.split(', ', expand=True))
-
-    # split the emotion output dictionary into new columns
-    # (thanks to https://stackoverflow.com/a/13053267 for partial solution)
-    comments['negative_emotion'] = sentiment_df[0].str.split(
-        ': ').str[-1].astype(float)
-    comments['neutral_emotion'] = sentiment_df[1].str.split(
-        ': ').str[-1].astype(float)
-    comments['positive_emotion'] = sentiment_df[2].str.split(
-        ': ').str[-1].astype(float)
-    comments['compound_emotion'] = sentiment_df[3].str.split(
-        ': ').str[-1].astype(float)
+    # run sentiment analyzer over each comment body, and store the scores
+    # directly in the new columns
+    scores = score_sentiment(comments['body'], n_jobs=n_jobs, cache=cache,
+                             pool=pool)
+    for i, column in enumerate(SENTIMENT_COLUMNS):
+        comments[column] = scores[:, i]
 
     # return our dataframe
     return comments
@@ -280,9 +850,7 @@ def add_gratitude(comments, grateful_list):
     * overall counts
     * specific words
 
-    Thanks to https://stackoverflow.com/a/47686394
-
-    Requires: pandas , nltk , collections
+    Requires: pandas , re
 
     Parameters
     ----------
@@ -290,8 +858,9 @@ def add_gratitude(comments, grateful_list):
         ideally after `annotate_logs()` and `body_cleanup()`;
         can be run with either comments df or issues/tickets df
 
-    grateful_list : list or pd.Series of gratitude words to identify;
-        currently works only with grateful unigrams
+    grateful_list : list or set of gratitude expressions to identify, or
+        pattern compiled with `compile_gratitude()`; expressions can span
+        several words (e.g., "thank you")
 
     Returns
     -------
@@ -307,25 +876,13 @@ def add_gratitude(comments, grateful_list):
     >> comments = utils.annotate.add_gratitude(comments)
     """
 
-    # tokenize and count words
-    tokenizer = RegexpTokenizer(r'\w+')
-    comments['tokenized'] = comments['body'].apply(
-        str.lower).apply(tokenizer.tokenize)
-    comments['word_count'] = comments['tokenized'].apply(lambda x: Counter(x))
-
-    # count words if they're in our grateful list
-    comments['grateful_count'] = (
-        comments['word_count'].apply(
-            lambda x: np.sum([v for k, v in x.items()
-                              if k in grateful_list])))
-
-    # let us know which ones were used
-    comments['grateful_list'] = (
-        comments['word_count'].apply(
-            lambda x: [k for k in x if k in grateful_list]))
-
-    # remove the columns we don't need anymore
-    comments = comments.drop(columns=['tokenized', 'word_count'])
+    # count expressions of gratitude, and let us know which ones were used
+    grateful_pattern = compile_gratitude(grateful_list)
+    gratitude = [count_gratitude(body.lower(), grateful_pattern)
+                 for body in comments['body']]
+    comments['grateful_count'] = np.array(
+        [count for count, _ in gratitude], dtype=float)
+    comments['grateful_list'] = [used for _, used in gratitude]
 
     # spit back our dataframe now
     return comments
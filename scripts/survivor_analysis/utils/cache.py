@@ -0,0 +1,141 @@
+import hashlib
+import os
+import re
+import pandas as pd
+
+# This module only depends on pandas, so that the scripts that cannot import
+# the utils package use it through a symbolic link named utils_cache.py
+
+# extension of the cache files of each format
+_EXTENSIONS = {"pickle": "pkl", "feather": "feather"}
+
+
+def file_fingerprint(filename, check="mtime"):
+    """
+    Fingerprint of a file, which changes when the file changes
+
+    Parameters
+    ----------
+    filename : str
+
+    check : {"mtime", "hash"}, optional, default: "mtime"
+        Fingerprint the file by its modification time and size, or by a hash
+        of its content (slower, but robust to copies that change the
+        modification time).
+
+    Returns
+    -------
+    tuple or str
+    """
+    if check == "mtime":
+        stat = os.stat(filename)
+        return (stat.st_mtime_ns, stat.st_size)
+    elif check == "hash":
+        sha1 = hashlib.sha1()
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha1.update(block)
+        return sha1.hexdigest()
+    raise ValueError(
+        "Unknown check %s. Should be 'mtime' or 'hash'" % check)
+
+
+def cached(compute, key, fingerprint, cachedir, version=0, format="pickle",
+           columns=None):
+    """
+    Load a result from the cache, or compute and cache it
+
+    Results are stored in cachedir, in a file named after the key and the
+    fingerprint, so that a cached result is used only if it was computed
+    with the same fingerprint and version: callers bump the version when the
+    computation changes, so that results of previous versions of the code
+    are computed again. Files of previous fingerprints of the key are
+    removed when the result is cached again.
+
+    Requires: pandas , pyarrow (feather format)
+
+    Parameters
+    ----------
+    compute : callable
+        Computes the result, without argument
+
+    key : str
+        Identifies the result in the cache, e.g. the path of the data
+
+    fingerprint : tuple, list, str or int
+        Fingerprint of the inputs of the computation (see
+        `file_fingerprint()`), compared through its repr
+
+    cachedir : str
+        Folder in which the results are stored
+
+    version : int, optional, default: 0
+        Version of the computation
+
+    format : {"pickle", "feather"}, optional, default: "pickle"
+        Format of the cache file. Feather files only store data frames, from
+        which some columns can be read without reading the whole file.
+
+    columns : list of str, optional, default: None
+        Columns of the data frame to return, with the feather format. All
+        columns are returned if None.
+
+    Returns
+    -------
+    The result of compute()
+
+    Examples
+    --------
+    >> from utils import cache
+    >> tickets = cache.cached(
+    >>     lambda: pd.read_csv(filename, sep="\t"), filename,
+    >>     cache.file_fingerprint(filename), ".cache/tickets")
+    """
+    if format not in _EXTENSIONS:
+        raise ValueError(
+            "Unknown format %s. Should be 'pickle' or 'feather'" % format)
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    digest = hashlib.sha1(
+        repr((version, fingerprint)).encode("utf-8")).hexdigest()
+    cache_filename = os.path.join(
+        cachedir, "%s-%s.%s" % (name, digest, _EXTENSIONS[format]))
+
+    if os.path.exists(cache_filename):
+        if format == "feather":
+            return pd.read_feather(cache_filename, columns=columns)
+        return pd.read_pickle(cache_filename)
+
+    result = compute()
+
+    try:
+        os.makedirs(cachedir)
+    except OSError:
+        pass
+    # Remove the results of previous fingerprints of the key
+    pattern = re.compile(r"%s-[0-9a-f]{40}\.%s$" % (name, _EXTENSIONS[format]))
+    for previous in os.listdir(cachedir):
+        if pattern.match(previous):
+            os.remove(os.path.join(cachedir, previous))
+
+    # Write to a temporary file first, so that concurrent readers never see
+    # a partial file
+    temporary = "%s.%d.tmp" % (cache_filename, os.getpid())
+    if format == "feather":
+        result.to_feather(temporary)
+        if columns is not None:
+            result = result[columns]
+    else:
+        pd.to_pickle(result, temporary)
+    os.replace(temporary, cache_filename)
+    return result
+
+
+def has_pyarrow():
+    """
+    Whether pyarrow, needed by the feather format, is installed
+    """
+    try:
+        import pyarrow  # noqa
+    except ImportError:
+        return False
+    return True
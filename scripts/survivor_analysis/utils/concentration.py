@@ -0,0 +1,260 @@
+import numpy as np
+
+
+def top_k(counts, k):
+    """
+    Returns the k largest counts, in decreasing order
+
+    Only the k largest counts are sorted, so that this is linear in the
+    number of contributors.
+
+    Parameters
+    ----------
+    counts : array-like
+        Number of contributions of each contributor
+
+    k : int
+        Number of contributors to keep
+
+    Returns
+    -------
+    np.ndarray, shape (min(k, n_contributors), )
+        Empty if k <= 0
+    """
+    counts = np.asarray(counts)
+    if k <= 0:
+        return counts[:0]
+    if k < len(counts):
+        counts = counts[np.argpartition(counts, len(counts) - k)[-k:]]
+    return np.sort(counts)[::-1]
+
+
+def top_k_shares(counts, k, normalize="max"):
+    """
+    Returns the normalized contributions of the k top contributors
+
+    Parameters
+    ----------
+    counts : array-like
+        Number of contributions of each contributor
+
+    k : int
+        Number of contributors to keep
+
+    normalize : {"max", "total"}, optional, default: "max"
+        Normalize the contributions by the contributions of the top
+        contributor, or by the total number of contributions.
+
+    Returns
+    -------
+    np.ndarray of float, shape (min(k, n_contributors), )
+        In decreasing order
+    """
+    top = top_k(counts, k).astype(float)
+    if normalize == "max":
+        return top / top[0] if len(top) else top
+    elif normalize == "total":
+        return top / np.sum(counts)
+    raise ValueError(
+        "Unknown normalization %s. Should be 'max' or 'total'" % normalize)
+
+
+def grouped_top_k(group_codes, counts, k):
+    """
+    Returns the indices of the k largest counts of each group
+
+    All the groups are ranked at once, with a single sort of the counts by
+    group and decreasing count, rather than calling `top_k()` on each group.
+
+    Parameters
+    ----------
+    group_codes : np.ndarray of int
+        Group of each count
+
+    counts : np.ndarray
+        Number of contributions of each contributor of each group
+
+    k : int
+        Number of contributors to keep per group
+
+    Returns
+    -------
+    np.ndarray of int
+        Indices in counts of the min(k, n_contributors) top contributors of
+        each group, by increasing group code and decreasing count. Empty if
+        k <= 0.
+    """
+    group_codes = np.asarray(group_codes)
+    counts = np.asarray(counts)
+    order = np.lexsort((-counts, group_codes))
+    if k <= 0 or not len(order):
+        return order[:0]
+
+    # rank of each count in its group
+    sorted_codes = group_codes[order]
+    is_start = np.ones(len(order), dtype=bool)
+    is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts = np.flatnonzero(is_start)
+    lengths = np.diff(np.r_[starts, len(order)])
+    ranks = np.arange(len(order)) - np.repeat(starts, lengths)
+    return order[ranks < k]
+
+
+def grouped_top_k_shares(group_codes, counts, k, normalize="max"):
+    """
+    Returns the normalized contributions of the k top contributors of each
+    group
+
+    Parameters
+    ----------
+    group_codes : np.ndarray of int
+        Group of each count
+
+    counts : np.ndarray
+        Number of contributions of each contributor of each group
+
+    k : int
+        Number of contributors to keep per group
+
+    normalize : {"max", "total"}, optional, default: "max"
+        Normalize the contributions by the contributions of the top
+        contributor of the group, or by the total number of contributions of
+        the group.
+
+    Returns
+    -------
+    top_codes : np.ndarray of int
+        Group of each top contributor, in increasing order
+
+    shares : np.ndarray of float
+        Normalized contributions of the top contributors, in decreasing order
+        within each group
+
+    See also
+    --------
+    top_k_shares : the same for a single group
+    """
+    group_codes = np.asarray(group_codes)
+    counts = np.asarray(counts)
+    selected = grouped_top_k(group_codes, counts, k)
+    top_codes = group_codes[selected]
+    top = counts[selected].astype(float)
+    if normalize == "max":
+        # the first contributor of each group is its top contributor
+        is_start = np.ones(len(top_codes), dtype=bool)
+        is_start[1:] = top_codes[1:] != top_codes[:-1]
+        starts = np.flatnonzero(is_start)
+        lengths = np.diff(np.r_[starts, len(top_codes)])
+        return top_codes, top / np.repeat(top[starts], lengths)
+    elif normalize == "total":
+        n_groups = group_codes.max() + 1 if len(group_codes) else 0
+        totals = np.bincount(group_codes, weights=counts, minlength=n_groups)
+        return top_codes, top / totals[top_codes]
+    raise ValueError(
+        "Unknown normalization %s. Should be 'max' or 'total'" % normalize)
+
+
+def gini(counts):
+    """
+    Gini coefficient of the contributions
+
+    0 when all contributors contribute equally, close to 1 when a single
+    contributor does all the work. For integer counts, the contributions are
+    ranked with a histogram of the counts rather than a sort.
+
+    Parameters
+    ----------
+    counts : array-like
+        Number of contributions of each contributor
+
+    Returns
+    -------
+    float
+    """
+    counts = np.asarray(counts)
+    n = len(counts)
+    total = counts.sum()
+    if not n or not total:
+        return np.nan
+
+    if np.issubdtype(counts.dtype, np.integer):
+        # contributors with the same count occupy consecutive ranks: sum the
+        # ranks of each distinct count rather than sorting the counts
+        histogram = np.bincount(counts)
+        values = np.flatnonzero(histogram)
+        frequencies = histogram[values]
+        below = np.cumsum(frequencies) - frequencies
+        rank_sums = frequencies * below + frequencies * (frequencies + 1) / 2
+        weighted = np.sum(rank_sums * values)
+    else:
+        weighted = np.sum(np.arange(1, n + 1) * np.sort(counts))
+    return 2 * weighted / (n * total) - (n + 1) / n
+
+
+def top_share(counts, fraction=0.01):
+    """
+    Share of the contributions made by the top fraction of contributors
+
+    Parameters
+    ----------
+    counts : array-like
+        Number of contributions of each contributor
+
+    fraction : float, optional, default: 0.01
+        Fraction of the contributors considered, rounded up so that at least
+        one contributor is considered.
+
+    Returns
+    -------
+    float
+    """
+    counts = np.asarray(counts)
+    total = counts.sum()
+    if not len(counts) or not total:
+        return np.nan
+    k = int(np.ceil(fraction * len(counts)))
+    return np.partition(counts, len(counts) - k)[-k:].sum() / total
+
+
+def contributor_concentration(counts, k=5):
+    """
+    Compute the concentration metrics of contributions
+
+    Requires: numpy
+
+    Parameters
+    ----------
+    counts : array-like
+        Number of contributions (commits, tickets, comments...) of each
+        contributor
+
+    k : int, optional, default: 5
+        Number of top contributors
+
+    Returns
+    -------
+    dict with the following keys:
+        top_k : contributions of the k top contributors, normalized by the
+            contributions of the top contributor, in decreasing order
+        top_k_share : share of the contributions made by the k top
+            contributors
+        gini : Gini coefficient of the contributions
+        top_1pct_share : share of the contributions made by the top 1% of
+            contributors
+
+    Examples
+    --------
+    >> from utils import concentration
+    >> counts = commits["author_name"].fillna("").value_counts().values
+    >> metrics = concentration.contributor_concentration(counts, k=5)
+    >> bus_factor = np.mean(1 - metrics["top_k"])
+    """
+    counts = np.asarray(counts)
+    top = top_k(counts, k).astype(float)
+    total = counts.sum()
+    return {
+        "top_k": top / top[0] if len(top) else top,
+        "top_k_share": top.sum() / total if total else np.nan,
+        "gini": gini(counts),
+        "top_1pct_share": top_share(counts, 0.01),
+    }
@@ -0,0 +1,249 @@
+import os
+import pandas as pd
+from . import cache
+
+
+# schema of the raw GitHub dumps, as documented in metadata.md. Columns marked
+# as "datetime" are parsed as UTC timestamps.
+RAW_SCHEMAS = {
+    "comments": {
+        "author_association": "category",
+        "body": "object",
+        "created_at": "datetime",
+        "id": "Int64",
+        "node_id": "object",
+        "updated_at": "datetime",
+        "ticket_id": "Int64",
+        "author_name": "object",
+        "author_id": "Int64",
+    },
+    "tickets": {
+        "assignees": "object",
+        "author_association": "category",
+        "body": "object",
+        "closed_at": "datetime",
+        "comments": "Int64",
+        "created_at": "datetime",
+        "id": "Int64",
+        "labels": "object",
+        "locked": "boolean",
+        "node_id": "object",
+        "project": "category",
+        "organization": "category",
+        "author_name": "object",
+        "author_id": "Int64",
+        "ticket_id": "Int64",
+        "type": "category",
+        "updated_at": "datetime",
+    },
+    "commits": {
+        "author_name": "object",
+        "author_id": "Int64",
+        "date": "datetime",
+        "sha": "object",
+    },
+}
+
+# kind of each raw GitHub dump, from its filename
+RAW_KINDS = {"comments.tsv": "comments", "tickets.tsv": "tickets",
+             "issues.tsv": "tickets", "commits.tsv": "commits"}
+
+# columns stored as categoricals (dictionary encoded) in columnar formats,
+# including the suffixed columns of the joined frame
+CATEGORICAL_COLUMNS = ["project", "author_name", "type", "author_association"]
+
+# columns stored as timestamps in columnar formats
+DATETIME_COLUMNS = ["created_at", "updated_at", "closed_at",
+                    "ticket_created_at", "date"]
+
+# file extension of each supported output format
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def _with_suffixes(columns):
+    return set(columns) | set(
+        column + suffix for column in columns
+        for suffix in ("_comment", "_issue"))
+
+
+def write_processed(frame, filename, format="csv"):
+    """
+    Write a processed frame (comments, tickets, commits or joined)
+
+    Requires: pandas , pyarrow (parquet only)
+
+    Parameters
+    ----------
+    frame : pd.DataFrame
+
+    filename : str
+        Output filename, without extension
+
+    format : {"csv", "parquet"}, optional, default: "csv"
+        With "parquet", project, author, type and author association columns
+        are dictionary encoded, and timestamps are stored as UTC datetimes,
+        so that readers can load only the columns they need.
+
+    Returns
+    -------
+    filename : str
+        The output filename, with extension
+    """
+    if format not in EXTENSIONS:
+        raise ValueError(
+            "Unknown format %s. Supported formats are %s" %
+            (format, ", ".join(EXTENSIONS)))
+
+    filename = filename + EXTENSIONS[format]
+    if format == "csv":
+        frame.to_csv(filename, index=False, header=True)
+        return filename
+
+    frame = frame.copy(deep=False)
+    for column in frame.columns:
+        if column in _with_suffixes(CATEGORICAL_COLUMNS):
+            frame[column] = frame[column].astype("category")
+        elif column in _with_suffixes(DATETIME_COLUMNS):
+            frame[column] = pd.to_datetime(frame[column], utc=True)
+    frame.to_parquet(filename, index=False)
+    return filename
+
+
+def read_processed(filename, columns=None):
+    """
+    Read a processed frame written with `write_processed()`
+
+    The format is inferred from the extension of the filename.
+
+    Parameters
+    ----------
+    filename : str
+
+    columns : list of str, optional, default: None
+        Columns to load. All columns are loaded if None.
+
+    Returns
+    -------
+    pd.DataFrame
+
+    Examples
+    --------
+    >> from utils import data_io
+    >> comments = data_io.read_processed(
+    >>     "data/processed_data/numpy/processed-comments.parquet",
+    >>     columns=["author_name", "created_at", "compound_emotion"])
+    """
+    extension = os.path.splitext(filename)[1]
+    if extension == EXTENSIONS["parquet"]:
+        return pd.read_parquet(filename, columns=columns)
+    return pd.read_csv(filename, usecols=columns)
+
+
+def read_github_tsv(filename, columns=None, kind=None, parse_dates=True,
+                    engine=None, keep_default_na=True):
+    """
+    Read a raw GitHub dump (comments, tickets/issues or commits)
+
+    Columns are loaded with the dtypes of the schema in `RAW_SCHEMAS`:
+    categoricals for the author association and ticket type, nullable
+    integers for identifiers and UTC datetimes for timestamps. Only the
+    requested columns are parsed, so that scripts that do not need the bodies
+    do not pay for them.
+
+    Requires: pandas , pyarrow (optional)
+
+    Parameters
+    ----------
+    filename : str
+        comments.tsv, tickets.tsv, issues.tsv or commits.tsv file
+
+    columns : list of str, optional, default: None
+        Columns to load. All columns are loaded if None.
+
+    kind : {"comments", "tickets", "commits"}, optional
+        Kind of dump. Inferred from the filename if None.
+
+    parse_dates : bool, optional, default: True
+        Whether to parse timestamps. If False, they are kept as strings.
+
+    engine : {"c", "pyarrow"}, optional, default: None
+        Parser engine. Defaults to pyarrow if it is installed.
+
+    keep_default_na : bool, optional, default: True
+        As in `pd.read_csv()`: whether strings such as "NA" or "null" are
+        missing values. If False, only empty fields are missing values, so
+        that authors named "NA" are kept, and text columns keep empty
+        strings.
+
+    Returns
+    -------
+    pd.DataFrame
+
+    Examples
+    --------
+    >> from utils import data_io
+    >> tickets = data_io.read_github_tsv(
+    >>     "data/raw_data/numpy/issues.tsv",
+    >>     columns=["author_id", "type", "created_at"])
+    """
+    if kind is None:
+        try:
+            kind = RAW_KINDS[os.path.basename(filename)]
+        except KeyError:
+            raise ValueError(
+                "Cannot infer the kind of GitHub dump of %s. Please provide "
+                "the kind argument." % filename)
+    schema = RAW_SCHEMAS[kind]
+
+    if engine is None:
+        # pyarrow always converts timestamps, so only use it when we want
+        # them parsed.
+        engine = "pyarrow" if parse_dates and cache.has_pyarrow() else "c"
+
+    header = pd.read_csv(filename, sep="\t", nrows=0).columns
+    usecols = columns
+    index_col = None
+    if columns is None:
+        columns = list(header)
+        if header[0].startswith("Unnamed:"):
+            # The dumps were written with their index
+            index_col = 0
+            columns = columns[1:]
+
+    missing = set(columns) - set(header)
+    if missing:
+        raise ValueError(
+            "Columns %s are not in %s" % (", ".join(sorted(missing)),
+                                          filename))
+
+    dtype = {column: schema[column] for column in columns
+             if column in schema and schema[column] != "datetime"}
+    dates = [column for column in columns
+             if schema.get(column) == "datetime"]
+    if not parse_dates:
+        dtype.update({column: "object" for column in dates})
+        dates = []
+
+    na_values = None
+    if not keep_default_na:
+        # Empty fields are missing values in the columns that are not text
+        if engine == "pyarrow":
+            # pyarrow does not parse text columns as missing values
+            na_values = [""]
+        else:
+            na_values = {column: [""] for column in columns
+                         if schema.get(column) not in (None, "object",
+                                                       "category")}
+    frame = pd.read_csv(filename, sep="\t", usecols=usecols, dtype=dtype,
+                        index_col=index_col, engine=engine,
+                        keep_default_na=keep_default_na, na_values=na_values)
+    if engine == "pyarrow" and not keep_default_na:
+        # ... except in text columns without any value
+        for column in frame.columns:
+            if (schema.get(column) in ("object", "category") and
+                    frame[column].isnull().all() and len(frame)):
+                frame[column] = pd.Series(
+                    "", index=frame.index).astype(schema[column])
+    for column in dates:
+        frame[column] = pd.to_datetime(frame[column], utc=True)
+    return frame
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+
+# This module only depends on the standard library, so that the scripts that
+# cannot import the utils package use it through a symbolic link named
+# utils_parallel.py
+
+# resources shared by the tasks of the current process, set by init_worker
+worker_state = {}
+
+
+def effective_n_jobs(n_jobs, n_tasks=None):
+    """
+    Number of processes to use
+
+    Parameters
+    ----------
+    n_jobs : int or None
+        Number of processes requested. -1 uses all CPUs, and None is 1.
+
+    n_tasks : int, optional, default: None
+        Number of tasks: no more processes than tasks are used.
+
+    Returns
+    -------
+    int
+    """
+    if n_jobs is None:
+        n_jobs = 1
+    elif n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if n_tasks is not None:
+        n_jobs = min(n_jobs, n_tasks)
+    return max(n_jobs, 1)
+
+
+def init_worker(state=None, initializer=None):
+    """
+    Set the resources shared by the tasks of the current process
+
+    Run in each process of the pools created by `create_pool()`. Call it
+    directly to run the same tasks in the current process.
+
+    Parameters
+    ----------
+    state : dict, optional, default: None
+        Resources stored in `worker_state`
+
+    initializer : callable, optional, default: None
+        Returns a dict of resources created in the process itself, for
+        resources that are expensive or impossible to pickle
+    """
+    worker_state.clear()
+    if state is not None:
+        worker_state.update(state)
+    if initializer is not None:
+        worker_state.update(initializer())
+
+
+def create_pool(n_jobs, state=None, initializer=None):
+    """
+    Create a pool of processes sharing resources between their tasks
+
+    The resources are sent once to each process, rather than with each task,
+    and tasks read them from `worker_state`.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Number of processes, see `effective_n_jobs()`
+
+    state, initializer : optional
+        See `init_worker()`
+
+    Returns
+    -------
+    multiprocessing.Pool
+
+    Examples
+    --------
+    >> from utils import parallel
+    >> def _count_bots(names):
+    >>     return sum(name in parallel.worker_state["bots"] for name in names)
+    >> with parallel.create_pool(-1, state={"bots": set(bots)}) as pool:
+    >>     counts = pool.map(_count_bots, chunks_of_names)
+    """
+    return multiprocessing.Pool(effective_n_jobs(n_jobs),
+                                initializer=init_worker,
+                                initargs=(state, initializer))
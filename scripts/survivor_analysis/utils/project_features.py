@@ -1,4 +1,6 @@
 import numpy as np
+import pandas as pd
+from . import concentration
 
 
 def compute_bus_factor(commits, n_committers=5):
@@ -8,7 +10,7 @@ def compute_bus_factor(commits, n_committers=5):
     Parameters
     ----------
     commits : pd.DataFrame
-        Data Frame containing the commit information.
+        Data Frame containing the commit information. It is left unchanged.
 
     n_committers : int, optional, default: 5
         Number of committers to consider in the bus factor
@@ -17,12 +19,125 @@ def compute_bus_factor(commits, n_committers=5):
     -------
     bus_factor: Lower is better
     """
+    author_codes, _ = pd.factorize(commits["author_name"].fillna(""))
+    commits_counts = np.bincount(author_codes)
+    return np.mean(
+        1 - concentration.top_k_shares(commits_counts, n_committers))
 
-    commits["author_name"] = commits["author_name"].replace(
-        np.nan, "", regex=True)
-    _, commits_counts = np.unique(commits["author_name"], return_counts=True)
-    commits_counts.sort()
-    commits_counts = commits_counts[::-1].astype(float)
-    commits_counts /= commits_counts.max()
-    bus_factor = np.mean(1 - commits_counts[:n_committers])
-    return bus_factor
+
+def compute_bus_factors(commits, n_committers=5, window=None):
+    """
+    Compute the bus factor of many projects, and optionally over time
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    commits : pd.DataFrame
+        Commits of all the projects, with author_name, project and (if window
+        is provided) date columns. It is left unchanged.
+
+    n_committers : int, optional, default: 5
+        Number of committers to consider in the bus factor
+
+    window : int, optional, default: None
+        If provided, compute the bus factor of each project over rolling
+        windows of `window` months, one per month: the window of a month
+        covers that month and the `window - 1` previous ones. If None, compute
+        the bus factor of each project over its whole history.
+
+    Returns
+    -------
+    bus_factors : pd.Series
+        Bus factor (lower is better), indexed by project, or by project and
+        month (as pd.Period) if window is provided. Months without commits in
+        their window are omitted.
+
+    Examples
+    --------
+    >> from utils import data_io, project_features
+    >> commits = pd.concat([
+    >>     data_io.read_github_tsv(
+    >>         "data/raw_data/%s/commits.tsv" % project,
+    >>         columns=["author_name", "date"]).assign(project=project)
+    >>     for project in ["numpy", "scipy"]])
+    >> bus_factors = project_features.compute_bus_factors(commits, window=12)
+    """
+    author_codes, _ = pd.factorize(commits["author_name"].fillna(""))
+    project_codes, projects = pd.factorize(commits["project"], sort=True)
+    n_authors = author_codes.max() + 1 if len(author_codes) else 1
+    # commits without project are ignored
+    valid = project_codes >= 0
+
+    if window is None:
+        group_codes, _, counts = _count_pairs(
+            project_codes[valid], author_codes[valid], n_authors)
+        bus_factors = _bus_factor_per_group(
+            group_codes, counts, len(projects), n_committers=n_committers)
+        return pd.Series(bus_factors, index=pd.Index(projects, name="project"),
+                         name="bus_factor")
+
+    # months since year 0, so that windows can be shifted by adding integers
+    dates = pd.to_datetime(commits["date"], utc=True)
+    valid &= dates.notnull().values
+    months = (dates.dt.year.values[valid] * 12 +
+              dates.dt.month.values[valid] - 1).astype(np.int64)
+    if not len(months):
+        return pd.Series(
+            [], name="bus_factor", dtype=float,
+            index=pd.MultiIndex.from_arrays([[], []],
+                                            names=["project", "month"]))
+    first_month = months.min()
+    n_months = months.max() - first_month + 1
+
+    # count the commits of each author per project and month, then add those
+    # counts to each window the month belongs to, up to the last month of the
+    # project
+    cell_codes, cell_authors, cell_counts = _count_pairs(
+        project_codes[valid] * n_months + (months - first_month),
+        author_codes[valid], n_authors)
+    cell_projects, cell_months = np.divmod(cell_codes, n_months)
+    last_months = np.full(len(projects), -1, dtype=np.int64)
+    np.maximum.at(last_months, cell_projects, cell_months)
+
+    window_months = np.concatenate(
+        [cell_months + offset for offset in range(window)])
+    window_projects = np.tile(cell_projects, window)
+    keep = window_months <= last_months[window_projects]
+    window_codes, _, counts = _count_pairs(
+        (window_projects * n_months + window_months)[keep],
+        np.tile(cell_authors, window)[keep], n_authors,
+        weights=np.tile(cell_counts, window)[keep])
+
+    windows, group_codes = np.unique(window_codes, return_inverse=True)
+    bus_factors = _bus_factor_per_group(
+        group_codes, counts, len(windows), n_committers=n_committers)
+    window_projects, window_months = np.divmod(windows, n_months)
+    index = pd.MultiIndex.from_arrays(
+        [projects[window_projects],
+         pd.PeriodIndex(
+             ordinal=window_months + first_month - 1970 * 12, freq="M")],
+        names=["project", "month"])
+    return pd.Series(bus_factors, index=index, name="bus_factor")
+
+
+def _count_pairs(group_codes, author_codes, n_authors, weights=None):
+    # Number of commits (or sum of the weights) of each distinct (group,
+    # author) pair. Returns the group codes, author codes and counts.
+    keys = group_codes.astype(np.int64) * n_authors + author_codes
+    keys, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, weights=weights, minlength=len(keys))
+    group_codes, author_codes = np.divmod(keys, n_authors)
+    return group_codes, author_codes, counts.astype(np.int64)
+
+
+def _bus_factor_per_group(group_codes, counts, n_groups, n_committers=5):
+    # Bus factor of each group, given the number of commits of each of its
+    # authors: the mean of 1 - count / max_count over the n_committers top
+    # committers. NaN for groups without commits.
+    top_codes, shares = concentration.grouped_top_k_shares(
+        group_codes, counts, n_committers)
+    total = np.bincount(top_codes, weights=1 - shares, minlength=n_groups)
+    n_top = np.bincount(top_codes, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / n_top
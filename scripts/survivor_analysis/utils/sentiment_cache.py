@@ -0,0 +1,192 @@
+import hashlib
+import os
+import sqlite3
+import time
+import numpy as np
+
+
+class SentimentCache(object):
+    """
+    Persistent cache of VADER sentiment scores
+
+    The scores are stored in a SQLite database, keyed on a hash of the
+    (cleaned) body, so that refreshing a dataset only requires scoring the new
+    bodies. When the cache grows above `max_entries`, the least recently used
+    entries are evicted.
+
+    Requires: numpy , sqlite3 , hashlib
+
+    Parameters
+    ----------
+    filename : str
+        Path to the SQLite database. Created if it does not exist.
+
+    max_entries : int, optional, default: None
+        Maximum number of bodies kept in the cache. None means no limit.
+
+    Attributes
+    ----------
+    hits : int
+        Number of bodies found in the cache since it was opened.
+
+    misses : int
+        Number of bodies not found in the cache since it was opened.
+
+    Examples
+    --------
+    >> from utils import annotate, sentiment_cache
+    >> cache = sentiment_cache.SentimentCache("sentiment_cache/vader.sqlite")
+    >> comments = annotate.add_sentiment(comments, cache=cache)
+    >> print(cache.hits, cache.misses)
+    >> cache.close()
+    """
+
+    # maximum number of parameters of a single SQLite query
+    _batch_size = 500
+
+    def __init__(self, filename, max_entries=None):
+        dirname = os.path.dirname(filename)
+        if dirname:
+            try:
+                os.makedirs(dirname)
+            except OSError:
+                pass
+
+        self.filename = filename
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Generous timeout: several projects may be processed concurrently.
+        self._connection = sqlite3.connect(filename, timeout=600)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key BLOB PRIMARY KEY, neg REAL, neu REAL, pos REAL, "
+            "compound REAL, last_used INTEGER)")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS scores_last_used "
+            "ON scores (last_used)")
+        self._connection.commit()
+        self._last_stamp = 0
+
+    def _stamps(self, n):
+        # Increasing access stamps, one per entry. They are taken from the
+        # clock (in ns), so that processes sharing the cache agree on the
+        # order of the accesses.
+        start = max(time.time_ns(), self._last_stamp + 1)
+        self._last_stamp = start + n - 1
+        return range(start, start + n)
+
+    def __len__(self):
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def hash(bodies):
+        """
+        Compute the cache keys of each body
+
+        Parameters
+        ----------
+        bodies : pd.Series or list of str
+
+        Returns
+        -------
+        keys : list of bytes
+        """
+        return [hashlib.sha1(body.encode("utf-8")).digest()
+                for body in bodies]
+
+    def get(self, keys):
+        """
+        Look up the scores of each key
+
+        Parameters
+        ----------
+        keys : list of bytes
+            Keys, as computed by `SentimentCache.hash`.
+
+        Returns
+        -------
+        scores : np.ndarray of float64, shape (n_keys, 4)
+            Negative, neutral, positive and compound scores. NaN for keys that
+            are not in the cache.
+
+        found : np.ndarray of bool, shape (n_keys, )
+            Whether each key was found in the cache.
+        """
+        distinct_keys = list(set(keys))
+        cached = {}
+        for start in range(0, len(distinct_keys), self._batch_size):
+            batch = distinct_keys[start:start + self._batch_size]
+            query = (
+                "SELECT key, neg, neu, pos, compound FROM scores "
+                "WHERE key IN (%s)" % ", ".join("?" * len(batch)))
+            for row in self._connection.execute(query, batch):
+                cached[row[0]] = row[1:]
+
+        scores = np.full((len(keys), 4), np.nan)
+        found = np.zeros(len(keys), dtype=bool)
+        for i, key in enumerate(keys):
+            if key in cached:
+                scores[i] = cached[key]
+                found[i] = True
+
+        # Mark the entries we just used, in the order of the keys, so that
+        # they are evicted last.
+        used = [key for key in dict.fromkeys(keys) if key in cached]
+        self._connection.executemany(
+            "UPDATE scores SET last_used = ? WHERE key = ?",
+            zip(self._stamps(len(used)), used))
+        self._connection.commit()
+
+        self.hits += int(found.sum())
+        self.misses += int((~found).sum())
+        return scores, found
+
+    def set(self, keys, scores):
+        """
+        Store the scores of each key, and evict the least recently used
+        entries if the cache is full.
+
+        Parameters
+        ----------
+        keys : list of bytes
+            Keys, as computed by `SentimentCache.hash`.
+
+        scores : np.ndarray of float64, shape (n_keys, 4)
+            Negative, neutral, positive and compound scores.
+        """
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO scores "
+            "(key, neg, neu, pos, compound, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, ) + tuple(float(s) for s in score) + (stamp, )
+             for key, score, stamp in zip(keys, scores,
+                                          self._stamps(len(keys)))])
+        self._connection.commit()
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries above `max_entries`
+        """
+        if self.max_entries is None:
+            return
+
+        num_extra = len(self) - self.max_entries
+        if num_extra <= 0:
+            return
+        self._connection.execute(
+            "DELETE FROM scores WHERE key IN ("
+            "SELECT key FROM scores ORDER BY last_used LIMIT ?)",
+            (num_extra, ))
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+
+def survival_curve(counts, censored=None):
+    """
+    Compute the survival curve of contributors
+
+    The survival at i is the fraction of contributors that made more than i
+    contributions (for example, opened more than i pull requests). The curve
+    is computed in a single pass, from the histogram of the counts.
+
+    With censoring, contributors still active at the time of the snapshot
+    are not considered as having stopped contributing after their last
+    contribution: the curve is then the Kaplan-Meier estimate, where
+    censored contributors are only counted as at risk up to their current
+    number of contributions.
+
+    Requires: numpy
+
+    Parameters
+    ----------
+    counts : array-like of int
+        Number of contributions of each contributor
+
+    censored : array-like of bool, optional, default: None
+        Whether each contributor is still active (see `is_censored()`). If
+        None, no contributor is censored.
+
+    Returns
+    -------
+    survival : np.ndarray of float, shape (max(counts) + 1, )
+        survival[i] is the probability of making more than i contributions.
+
+    Examples
+    --------
+    >> from utils import survival
+    >> counts = pull_requests["author_id"].value_counts(dropna=False).values
+    >> survival_data = survival.survival_curve(counts)
+    >> ax.plot(np.arange(len(survival_data)) + 1, survival_data)
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    if not len(counts):
+        return np.zeros(0)
+
+    histogram = np.bincount(counts)
+    # number of contributors with at least i contributions
+    at_risk = np.cumsum(histogram[::-1])[::-1]
+    if censored is None:
+        # Without censoring, this is the fraction of contributors with more
+        # than i contributions
+        return np.append(at_risk[1:], 0) / len(counts)
+
+    censored = np.asarray(censored, dtype=bool)
+    stopped = np.bincount(counts[~censored], minlength=len(histogram))
+    return np.cumprod(1 - stopped / at_risk)
+
+
+def proportion_at_least(counts, thresholds):
+    """
+    Fraction of contributors that made at least n contributions, for each
+    threshold n
+
+    Parameters
+    ----------
+    counts : array-like of int
+        Number of contributions of each contributor
+
+    thresholds : list of int
+
+    Returns
+    -------
+    np.ndarray of float, shape (len(thresholds), )
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    thresholds = np.asarray(thresholds, dtype=np.int64)
+    if not len(counts):
+        return np.full(len(thresholds), np.nan)
+
+    # number of contributors with at least i contributions, for i up to the
+    # largest count + 1
+    at_risk = np.append(np.cumsum(np.bincount(counts)[::-1])[::-1], 0)
+    thresholds = np.clip(thresholds, 0, len(at_risk) - 1)
+    return at_risk[thresholds] / len(counts)
+
+
+def is_censored(last_activity, window, snapshot=None):
+    """
+    Whether each contributor is still active at the time of the snapshot
+
+    Parameters
+    ----------
+    last_activity : pd.Series of timestamps
+        Date of the last contribution of each contributor
+
+    window : int
+        Number of days before the snapshot during which contributors that
+        contributed are considered still active
+
+    snapshot : str or pd.Timestamp, optional, default: None
+        Date of the snapshot. Defaults to the most recent contribution.
+
+    Returns
+    -------
+    np.ndarray of bool
+        Contributors without last activity are not censored.
+    """
+    last_activity = pd.to_datetime(last_activity, utc=True)
+    if snapshot is None:
+        snapshot = last_activity.max()
+    snapshot = pd.Timestamp(snapshot)
+    if snapshot.tzinfo is None:
+        snapshot = snapshot.tz_localize("UTC")
+    censored = last_activity > snapshot - pd.Timedelta(days=window)
+    return np.asarray(censored.fillna(False), dtype=bool)
@@ -0,0 +1,186 @@
+import os
+import numpy as np
+import pandas as pd
+from . import cache, data_io
+from .annotate import to_epoch_ns
+
+
+# column holding the date of each kind of activity
+SOURCES = {"comments": "created_at", "tickets": "created_at",
+           "commits": "date"}
+
+# granularities at which the activity is counted, as pandas frequencies
+FREQUENCIES = ["W", "M", "2M", "3M"]
+
+_DAY = 24 * 3600 * 10 ** 9
+
+# version of the counts, to bump when they change so that cached counts are
+# computed again
+_VERSION = 2
+
+
+def _parse_frequency(freq):
+    # "W" or "<n>M"
+    if freq == "W":
+        return "W", 1
+    if freq.endswith("M"):
+        return "M", int(freq[:-1] or 1)
+    raise ValueError(
+        "Unknown frequency %s. Should be 'W' or '<n>M'" % freq)
+
+
+def bin_timestamps(timestamps, freq="2M"):
+    """
+    Assign timestamps to the bins of `pd.DataFrame.resample(freq)`
+
+    Bins are computed with integer arithmetic on the number of days or
+    months since epoch, and anchored as pandas does: weeks end on Sundays
+    ("W" is "W-SUN"), and bins of n months end on the last day of the
+    (n - 1)-th month after the first timestamp. Bins are closed and labelled
+    on the right.
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    timestamps : pd.Series of timestamps
+
+    freq : str, optional, default: "2M"
+        "W" for weeks, "M", "2M", "3M", ... for bins of months
+
+    Returns
+    -------
+    codes : np.ndarray of int, shape (len(timestamps), )
+        Bin of each timestamp, -1 for missing timestamps
+
+    labels : pd.DatetimeIndex
+        Label of each bin, from the first to the last timestamp
+    """
+    unit, n = _parse_frequency(freq)
+    timestamps = to_epoch_ns(timestamps)
+    valid = timestamps != np.iinfo(np.int64).min
+    codes = np.full(len(timestamps), -1, dtype=np.int64)
+    if not valid.any():
+        return codes, pd.DatetimeIndex([], tz="UTC")
+
+    days = timestamps[valid] // _DAY
+    if unit == "W":
+        # 1970-01-05 is the first Monday after epoch: weeks start on Mondays
+        # and are labelled by their Sunday
+        weeks = (days + 3) // 7
+        first = weeks.min()
+        codes[valid] = weeks - first
+        labels = (np.arange(first, weeks.max() + 1) * 7 + 3) * _DAY
+    else:
+        # number of months since epoch
+        months = days.astype("datetime64[D]").astype(
+            "datetime64[M]").astype(np.int64)
+        first = months.min()
+        codes[valid] = (months - first + n - 1) // n
+        # bins are labelled by the last day of their last month, the day
+        # before the first day of the next month
+        next_months = first + n * np.arange(codes.max() + 1) + 1
+        labels = (next_months.astype("datetime64[M]").astype(
+            "datetime64[D]").astype(np.int64) - 1) * _DAY
+    return codes, pd.DatetimeIndex(labels).tz_localize("UTC")
+
+
+def count_activity(timestamps, is_bot, freqs=FREQUENCIES):
+    """
+    Count the activity of humans and bots at several granularities
+
+    Each timestamp is binned once per granularity, and counted with
+    `np.bincount`.
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    timestamps : pd.Series of timestamps
+
+    is_bot : array-like of bool
+        Whether each action was made by a bot
+
+    freqs : list of str, optional, default: FREQUENCIES
+        Granularities, see `bin_timestamps()`
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by the granularity and the label of the bin, with the total
+        number of actions ("total") and the number of actions made by bots
+        ("bots")
+    """
+    is_bot = np.asarray(is_bot, dtype=bool)
+    counts = []
+    for freq in freqs:
+        codes, labels = bin_timestamps(timestamps, freq)
+        valid = codes != -1
+        counts.append(pd.DataFrame({
+            "freq": freq,
+            "date": labels,
+            "total": np.bincount(codes[valid], minlength=len(labels)),
+            "bots": np.bincount(codes[valid & is_bot],
+                                minlength=len(labels)),
+        }))
+    return pd.concat(counts, ignore_index=True).set_index(["freq", "date"])
+
+
+def load_activity_counts(folder, bots, cachedir=".cache/activity_counts",
+                         freqs=FREQUENCIES):
+    """
+    Load the counts of comments, tickets and commits of a project
+
+    Each source of the project is read once, and its activity counted at
+    all the granularities. The counts are stored in cachedir, and computed
+    again only when the data or the list of bots change.
+
+    Requires: numpy , pandas
+
+    Parameters
+    ----------
+    folder : str
+        Folder of the project, with the comments.tsv, tickets.tsv and
+        commits.tsv files
+
+    bots : list of str
+        Names of the bots
+
+    cachedir : str, optional, default: ".cache/activity_counts"
+        Folder in which the counts are stored
+
+    freqs : list of str, optional, default: FREQUENCIES
+        Granularities, see `bin_timestamps()`
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by the source ("comments", "tickets" or "commits"), the
+        granularity and the label of the bin, with the "total" and "bots"
+        columns
+
+    Examples
+    --------
+    >> from utils import timeseries
+    >> bots = pd.read_csv("../bot_names.txt")["bot_name"]
+    >> counts = timeseries.load_activity_counts(
+    >>     "data/raw_data/dataset_upto2019/numpy", bots)
+    >> counts.loc[("comments", "2M")]
+    """
+    def compute():
+        counts = {}
+        for source, column in sorted(SOURCES.items()):
+            data = data_io.read_github_tsv(
+                os.path.join(folder, "%s.tsv" % source),
+                columns=["author_name", column])
+            counts[source] = count_activity(
+                data[column], np.isin(data["author_name"], list(bots)),
+                freqs=freqs)
+        return pd.concat(counts, names=["source"]).sort_index()
+
+    fingerprint = (
+        [cache.file_fingerprint(os.path.join(folder, "%s.tsv" % source))
+         for source in sorted(SOURCES)],
+        sorted(set(bots)), list(freqs))
+    return cache.cached(compute, os.path.abspath(folder), fingerprint,
+                        cachedir, version=_VERSION)
@@ -0,0 +1,155 @@
+"""
+Build the per-project supplementary figures in a single run
+
+matplotlib and pandas are imported once, and each table of model results is
+loaded once and shared by all the figures that use it. Figures that are more
+recent than their inputs (the table of model results and the plotting code)
+are skipped, as make would.
+"""
+
+import argparse
+import os
+import time
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa
+import pandas as pd  # noqa
+import utils_parallel  # noqa
+
+import figure_supp_emotions_by_author_group_membership_projects  # noqa
+import figure_supp_gratitude_by_author_group_membership_projects  # noqa
+import figure_supp_emotions_timecourse_by_projects  # noqa
+import figure_supp_gratitude_timecourse_by_projects  # noqa
+
+
+PROJECTS = ["scikit-image", "scikit-learn", "matplotlib", "numpy", "scipy",
+            "mayavi", "sphinx-gallery", "pandas"]
+
+# module drawing each kind of figure, and the pattern of the output filename
+FIGURES = {
+    "sentiment": (
+        figure_supp_emotions_by_author_group_membership_projects,
+        "figures/supp/sentiment_%s.pdf"),
+    "gratitude": (
+        figure_supp_gratitude_by_author_group_membership_projects,
+        "figures/supp/gratitude_%s.pdf"),
+    "timecourse_sentiment": (
+        figure_supp_emotions_timecourse_by_projects,
+        "figures/supp/timecourse_sentiment_%s.pdf"),
+    "timecourse_gratitude": (
+        figure_supp_gratitude_timecourse_by_projects,
+        "figures/supp/timecourse_gratitude_%s.pdf"),
+}
+
+# plotting code shared by all figures
+SHARED_SOURCES = ["utils.py", "utils_vis.py"]
+
+
+def is_up_to_date(outname, inputs):
+    """
+    Whether outname exists and is more recent than all the inputs
+    """
+    if not os.path.exists(outname):
+        return False
+    last_modified = max(os.path.getmtime(filename) for filename in inputs)
+    return os.path.getmtime(outname) >= last_modified
+
+
+def list_figures(kinds=None, projects=None, force=False):
+    """
+    List the figures to build
+
+    Parameters
+    ----------
+    kinds : list of str, optional, default: None
+        Kinds of figures (keys of FIGURES). All kinds if None.
+
+    projects : list of str, optional, default: None
+        Projects. All PROJECTS if None.
+
+    force : bool, optional, default: False
+        Whether to list figures that are up to date
+
+    Returns
+    -------
+    list of (kind, project, outname) tuples
+    """
+    if kinds is None:
+        kinds = sorted(FIGURES)
+    if projects is None:
+        projects = PROJECTS
+
+    figures = []
+    for kind in kinds:
+        module, pattern = FIGURES[kind]
+        inputs = [module.MODEL_RESULTS, module.__file__] + SHARED_SOURCES
+        for project in projects:
+            outname = pattern % project
+            if force or not is_up_to_date(outname, inputs):
+                figures.append((kind, project, outname))
+    return figures
+
+
+def _build_figure(figure):
+    kind, project, outname = figure
+    module, _ = FIGURES[kind]
+    fig = module.make_figure(
+        utils_parallel.worker_state[module.MODEL_RESULTS], project)
+
+    try:
+        os.makedirs(os.path.dirname(outname))
+    except OSError:
+        pass
+    fig.savefig(outname)
+    plt.close("all")
+    return outname
+
+
+def build_figures(figures, n_jobs=1):
+    """
+    Build the figures, loading each table of model results once
+
+    Parameters
+    ----------
+    figures : list of (kind, project, outname) tuples
+        As returned by `list_figures()`
+
+    n_jobs : int, optional, default: 1
+        Number of processes among which the figures are split (-1 to use all
+        CPUs)
+    """
+    filenames = set(FIGURES[kind][0].MODEL_RESULTS for kind, _, _ in figures)
+    tables = {filename: pd.read_csv(filename, sep="\t")
+              for filename in sorted(filenames)}
+
+    n_jobs = utils_parallel.effective_n_jobs(n_jobs, len(figures))
+    if n_jobs > 1:
+        with utils_parallel.create_pool(n_jobs, state=tables) as pool:
+            for outname in pool.imap_unordered(_build_figure, figures):
+                print("Wrote", outname)
+    else:
+        utils_parallel.init_worker(tables)
+        for figure in figures:
+            print("Wrote", _build_figure(figure))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kinds", "-k", nargs="+", default=None,
+                        choices=sorted(FIGURES),
+                        help="Kinds of figures to build (default: all)")
+    parser.add_argument("--projects", "-p", nargs="+", default=None,
+                        help="Projects for which figures are built (default: "
+                             "all)")
+    parser.add_argument("--n-jobs", "-j", default=1, type=int,
+                        help="Number of figures built concurrently (-1 to "
+                             "use all CPUs)")
+    parser.add_argument("--force", "-f", action="store_true",
+                        help="Build figures even if they are up to date")
+    args = parser.parse_args()
+
+    start = time.time()
+    figures = list_figures(kinds=args.kinds, projects=args.projects,
+                           force=args.force)
+    build_figures(figures, n_jobs=args.n_jobs)
+    print("Built %d figures in %0.1fs" % (len(figures), time.time() - start))
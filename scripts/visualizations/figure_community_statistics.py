@@ -1,7 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-from utils_graphs import compute_contributions_per_project
+from utils_graphs import load_contributions_per_project
 from matplotlib import ticker
 from matplotlib.gridspec import GridSpec
 from utils_vis import add_letter_and_title
@@ -19,12 +18,7 @@ gs = GridSpec(110, 100,  figure=fig, top=0.9, left=0.1, right=0.96,
 # How many people contribute to more than one project?
 
 ax = fig.add_subplot(gs[:75, :12])
-data = pd.read_csv("results/data/sentiment_frame_original.tsv", sep="\t")
-
-all_authors_mapping = {
-    a: i for i, a in enumerate(np.unique(data["author_name"]))}
-
-contributions_per_projects = compute_contributions_per_project(data)
+contributions_per_projects = load_contributions_per_project()
 number_of_projects_contributed_to = (
     contributions_per_projects != 0).sum(axis=1).values
 num_proj, counts = np.unique(number_of_projects_contributed_to, return_counts=True)
@@ -48,8 +42,6 @@ add_letter_and_title(ax, "A", "")
 
 ax = fig.add_subplot(gs[:80, 25:52])
 
-contributions_per_projects = compute_contributions_per_project(data)
-
 num_contributions = (contributions_per_projects != 0).sum(axis=1)
 
 test = (contributions_per_projects > 0).astype(int)
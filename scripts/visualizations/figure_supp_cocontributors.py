@@ -1,20 +1,14 @@
 import numpy as np
-import pandas as pd
-from utils_graphs import compute_contributions_per_project
+from utils_graphs import load_contributions_per_project
 import matplotlib.pyplot as plt
 from matplotlib import ticker
 from matplotlib.gridspec import GridSpec
 
 
-data = pd.read_csv("results/data/sentiment_frame_original.tsv", sep="\t")
-
 ###############################################################################
 # First, draw a heatmap of the number of people that contribute to eac
 
-all_authors_mapping = {
-    a: i for i, a in enumerate(np.unique(data["author_name"]))}
-
-contributions_per_projects = compute_contributions_per_project(data)
+contributions_per_projects = load_contributions_per_project()
 contributions_per_projects = (contributions_per_projects > 0).astype(int)
 
 # Remove anyone that has contributed only to one project
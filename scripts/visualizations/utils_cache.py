@@ -0,0 +1 @@
+../survivor_analysis/utils/cache.py
\ No newline at end of file
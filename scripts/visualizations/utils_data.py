@@ -0,0 +1 @@
+../network_analysis/utils_data.py
\ No newline at end of file